@@ -1,26 +1,27 @@
-import glob
-import scipy.io
-import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data.manifest import missing_modalities, refresh_manifest
 
 DATA_PATH = 'APNEA HRV+SPO2 DATASET/HuGCDN2014-OXI'
-FOLDERS = ['C', 'D', 'ND']
 
-for folder in FOLDERS:
-    folder_path = os.path.join(DATA_PATH, folder)
-    if not os.path.exists(folder_path):
-        continue
-    
-    files = glob.glob(os.path.join(folder_path, '*.mat'))
-    if files:
-        sample_file = files[0]
-        try:
-            mat = scipy.io.loadmat(sample_file)
-            keys = [k for k in mat.keys() if not k.startswith('__')]
-            print(f"Folder {folder}: Sample file {os.path.basename(sample_file)} Keys: {keys}")
-            
-            # Print structure of first key
-            if keys:
-                val = mat[keys[0]]
-                print(f"  Shape: {val.shape}, Dtype: {val.dtype}")
-        except Exception as e:
-            print(f"Error loading {sample_file}: {e}")
+# Header-only scan: variable names, shapes and classes without decoding the signals
+manifest = refresh_manifest(sys.argv[1] if len(sys.argv) > 1 else DATA_PATH)
+
+records = manifest['records']
+print(f"{len(records)} records, modalities: {manifest['modalities']}")
+
+if records:
+    sample = next(iter(records))
+    for modality, entry in records[sample].items():
+        if entry is None:
+            print(f"{modality}: missing for sample record {sample}")
+            continue
+        for var in entry['variables']:
+            print(f"{modality}: Sample file {sample}.mat Key: {var['name']} "
+                  f"Shape: {tuple(var['shape'])}, Class: {var['dtype']}, Size: {entry['size']} bytes")
+
+for name, absent in missing_modalities(manifest).items():
+    print(f"Record {name} missing: {absent}")
@@ -0,0 +1,5 @@
+"""API module initialization."""
+
+from .ingestion import IngestionPipeline, LocalUploadStore
+
+__all__ = ['IngestionPipeline', 'LocalUploadStore']
@@ -0,0 +1,382 @@
+"""
+Asynchronous ingestion pipeline behind POST /upload/ecg and GET /sessions/{id}/status.
+
+Uploads flow through decode -> segment -> features -> predict. Stages are joined
+by bounded asyncio queues so a slow stage pushes back on the stages before it,
+and ultimately on new uploads. CPU-heavy work runs in a process pool.
+
+Predictor contract: the predict stage calls predictor(features) where features
+is an unscaled float array of shape (n_windows, len(WINDOW_FEATURES)) with the
+columns of src.features.hrv_features.WINDOW_FEATURES (mean_rr, sdnn, rmssd in
+milliseconds, pnn50 in percent). It must return one apnea probability in [0, 1]
+per window, and be picklable (a module-level function or an instance of a
+module-level class) because it runs in the process pool. The record-level
+SleepApneaRFModel trained on extracted_features.csv does not satisfy this
+contract; a predictor has to be trained on per-window features.
+"""
+
+import asyncio
+import itertools
+import logging
+import shutil
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+
+import numpy as np
+
+from src.data.loader import APNEADataLoader
+from src.data.quality import filter_windows
+from src.db.results_store import ResultsStore
+from src.features.hrv_features import extract_window_features
+from src.utils.helpers import segment_signal
+
+logger = logging.getLogger(__name__)
+
+# Status values and progress as documented in docs/API_DOCUMENTATION.md
+STAGE_STATUS = {
+    'uploaded': ('uploaded', 0, 'Queued'),
+    'decode': ('preprocessing', 10, 'Decoding signal'),
+    'segment': ('preprocessing', 30, 'Segmenting signal'),
+    'features': ('feature_extraction', 55, 'Feature extraction'),
+    'predict': ('prediction', 80, 'Running ML models'),
+    'completed': ('completed', 100, 'Done'),
+    'failed': ('failed', 100, 'Failed'),
+}
+
+
+class LocalUploadStore:
+    """
+    Filesystem stand-in for the upload store.
+
+    Each session gets its own directory laid out like the dataset root
+    (<root>/<session_id>/<modality>/<session_id>.mat) so APNEADataLoader
+    can decode it unchanged.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def session_dir(self, session_id: int) -> Path:
+        return self.root / str(session_id)
+
+    def save(self, session_id: int, data: bytes, modality: str = 'RR') -> Path:
+        """Write an uploaded .mat file and return its path."""
+        path = self.session_dir(session_id) / modality / f"{session_id}.mat"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        return path
+
+    def delete(self, session_id: int) -> None:
+        shutil.rmtree(self.session_dir(session_id), ignore_errors=True)
+
+
+# Stage functions run in worker processes, so they must be module-level.
+
+def _decode(session_dir: str, record_name: str, modality: str) -> Optional[np.ndarray]:
+    return APNEADataLoader(session_dir).load_mat_data(record_name, modality)
+
+
+def _segment(signal: np.ndarray, segment_size: int, quality_check: bool) -> np.ndarray:
+    segments = segment_signal(signal, segment_size)
+    if quality_check and len(segments) > 0:
+        segments, _ = filter_windows(segments, signal_type='rr')
+    return segments
+
+
+def _predict(predictor: Callable[[np.ndarray], np.ndarray], features: np.ndarray) -> np.ndarray:
+    scores = np.asarray(predictor(features), dtype=float).ravel()
+    if scores.shape != (len(features),):
+        raise ValueError(f"Predictor returned {scores.shape[0]} scores for {len(features)} windows")
+    return scores
+
+
+class IngestionPipeline:
+    """
+    Bounded, multi-stage asyncio pipeline for uploaded recordings.
+
+    Args:
+        store: Upload store the raw files are written to
+        predictor: Picklable callable mapping the (n_windows, len(WINDOW_FEATURES))
+            feature matrix to per-window apnea probabilities (see module docstring)
+        queue_size: Capacity of every inter-stage queue
+        workers_per_stage: Concurrent tasks pulling from each queue
+        segment_seconds: Window length in RR samples
+        quality_check: Drop artifact windows before feature extraction
+        executor: Executor for CPU-heavy stages (defaults to a process pool)
+        results_store: Optional store that allocates session ids and records
+            every session outcome (results are written off the event loop)
+        session_ttl: Seconds a finished session stays queryable in memory
+        max_finished_sessions: Finished sessions kept in memory at most
+    """
+
+    STAGES = ['decode', 'segment', 'features', 'predict']
+
+    def __init__(self, store: LocalUploadStore, predictor: Callable[[np.ndarray], np.ndarray],
+                 queue_size: int = 8, workers_per_stage: int = 1, segment_seconds: int = 60,
+                 quality_check: bool = True, executor: Optional[Executor] = None,
+                 results_store: Optional[ResultsStore] = None, session_ttl: float = 3600.0,
+                 max_finished_sessions: int = 1000):
+        self.store = store
+        self.predictor = predictor
+        self.queue_size = queue_size
+        self.workers_per_stage = workers_per_stage
+        self.segment_seconds = segment_seconds
+        self.quality_check = quality_check
+        self.results_store = results_store
+        self.session_ttl = session_ttl
+        self.max_finished_sessions = max_finished_sessions
+        self.sessions: Dict[int, Dict[str, Any]] = {}
+
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._done: Dict[int, asyncio.Event] = {}
+        self._finished: Deque[int] = deque()
+        # Store writes for cancelled reservations, awaited on stop()
+        self._pending_writes: Set[asyncio.Future] = set()
+        # Without a results store, ids only need to be unique within this process
+        self._ids = itertools.count(1)
+
+    async def start(self) -> None:
+        """Create the queues and stage workers."""
+        if self._tasks:
+            return
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor()
+        self._queues = {stage: asyncio.Queue(maxsize=self.queue_size) for stage in self.STAGES}
+        for i, stage in enumerate(self.STAGES):
+            next_stage = self.STAGES[i + 1] if i + 1 < len(self.STAGES) else None
+            for _ in range(self.workers_per_stage):
+                self._tasks.append(asyncio.create_task(self._worker(stage, next_stage)))
+
+    async def stop(self, drain: bool = True) -> None:
+        """Stop the workers, optionally letting queued sessions finish first."""
+        if not self._tasks:
+            return
+        if drain:
+            for stage in self.STAGES:
+                await self._queues[stage].join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await asyncio.gather(*self._pending_writes, return_exceptions=True)
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def submit(self, patient_id: Any, data: bytes, modality: str = 'RR',
+                     wait: bool = True) -> int:
+        """
+        Accept an upload and queue it for processing.
+
+        With wait=True the call blocks until the decode queue has room; with
+        wait=False a full queue raises asyncio.QueueFull so the caller can
+        answer 429/503 instead of buffering the upload.
+        """
+        self._evict_finished()
+        queue = self._queues['decode']
+        if not wait and queue.full():
+            raise asyncio.QueueFull("Ingestion queue is full")
+
+        session_id = await self._reserve_id(patient_id)
+        self.sessions[session_id] = {
+            'session_id': session_id,
+            'patient_id': patient_id,
+            'modality': modality,
+            'uploaded_at': time.time(),
+            'error': None,
+            'result': None,
+        }
+        self._done[session_id] = asyncio.Event()
+        self._set_stage(session_id, 'uploaded')
+
+        # Reserve queue space before touching disk so a backlog never grows the
+        # store; nothing awaits between the put and the save, so no worker can
+        # pick the session up before its file exists.
+        try:
+            if wait:
+                await queue.put(session_id)
+            else:
+                queue.put_nowait(session_id)
+        except BaseException:
+            # Cancelled while waiting on backpressure (e.g. client disconnect)
+            del self.sessions[session_id]
+            del self._done[session_id]
+            self._cancel_reservation(session_id)
+            raise
+        self.store.save(session_id, data, modality)
+        return session_id
+
+    def get_status(self, session_id: int) -> Dict[str, Any]:
+        """Return the status payload for a session."""
+        self._evict_finished()
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise KeyError(f"Unknown session: {session_id}")
+        return self._status(session)
+
+    async def wait_for(self, session_id: int) -> Dict[str, Any]:
+        """Wait until a session completes or fails and return its status."""
+        if session_id not in self._done:
+            raise KeyError(f"Unknown session: {session_id}")
+        # Keep a reference: the session may be evicted once it has finished
+        session = self.sessions[session_id]
+        await self._done[session_id].wait()
+        return self._status(session)
+
+    @staticmethod
+    def _status(session: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in session.items()
+                if k not in ('payload', 'modality', 'finished_at')}
+
+    def _set_stage(self, session_id: int, stage: str) -> None:
+        status, progress, step = STAGE_STATUS[stage]
+        self.sessions[session_id].update(status=status, progress=progress, current_step=step)
+
+    async def _worker(self, stage: str, next_stage: Optional[str]) -> None:
+        queue = self._queues[stage]
+        while True:
+            session_id = await queue.get()
+            try:
+                self._set_stage(session_id, stage)
+                done = await self._run_stage(stage, session_id)
+                if done or next_stage is None:
+                    await self._finish(session_id)
+                else:
+                    await self._queues[next_stage].put(session_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Session {session_id} failed during {stage}: {e}")
+                await self._finish(session_id, error=str(e))
+            finally:
+                queue.task_done()
+
+    async def _run_stage(self, stage: str, session_id: int) -> bool:
+        """Run one stage; returns True when the session needs no further stages."""
+        loop = asyncio.get_running_loop()
+        session = self.sessions[session_id]
+
+        if stage == 'decode':
+            signal = await loop.run_in_executor(
+                self._executor, _decode, str(self.store.session_dir(session_id)),
+                str(session_id), session['modality'])
+            if signal is None:
+                raise ValueError("Could not decode uploaded file")
+            session['payload'] = signal
+        elif stage == 'segment':
+            segments = await loop.run_in_executor(
+                self._executor, _segment, session['payload'], self.segment_seconds,
+                self.quality_check)
+            session['payload'] = segments
+            if len(segments) == 0:
+                session['result'] = {'n_windows': 0, 'window_scores': []}
+                return True
+        elif stage == 'features':
+            session['payload'] = await loop.run_in_executor(
+                self._executor, extract_window_features, session['payload'])
+        elif stage == 'predict':
+            scores = await loop.run_in_executor(
+                self._executor, _predict, self.predictor, session['payload'])
+            session['result'] = summarize_scores(scores)
+        return False
+
+    async def _reserve_id(self, patient_id: Any) -> int:
+        if self.results_store is None:
+            return next(self._ids)
+        # The store allocates ids so pipelines sharing it, or restarted ones,
+        # never reuse an id. The insert runs off the event loop and is shielded:
+        # if the caller is cancelled meanwhile, the row it creates is released.
+        future = asyncio.get_running_loop().run_in_executor(
+            None, self.results_store.create_session, patient_id)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            def release(reserved):
+                if not reserved.cancelled() and reserved.exception() is None:
+                    self._cancel_reservation(reserved.result())
+            future.add_done_callback(release)
+            raise
+
+    def _cancel_reservation(self, session_id: int) -> None:
+        """Mark a reserved id as cancelled in the store, without blocking the loop."""
+        if self.results_store is None:
+            return
+        future = asyncio.get_running_loop().run_in_executor(
+            None, self.results_store.finish_session, session_id, 'cancelled')
+        self._pending_writes.add(future)
+        future.add_done_callback(self._pending_writes.discard)
+
+    async def _finish(self, session_id: int, error: Optional[str] = None) -> None:
+        session = self.sessions[session_id]
+        session.pop('payload', None)
+        self.store.delete(session_id)
+        if self.results_store is not None:
+            try:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self._persist, session, error)
+            except Exception as e:
+                logger.error(f"Session {session_id} could not be persisted: {e}")
+                error = error or f"Could not persist results: {e}"
+            if error is None:
+                # Window scores now live in the results store
+                session['result'].pop('window_scores', None)
+        session['error'] = error
+        self._set_stage(session_id, 'failed' if error else 'completed')
+        session['finished_at'] = time.monotonic()
+        self._finished.append(session_id)
+        self._done[session_id].set()
+
+    def _evict_finished(self) -> None:
+        """Forget finished sessions past the TTL or beyond the retention cap."""
+        now = time.monotonic()
+        while self._finished and (
+                len(self._finished) > self.max_finished_sessions
+                or now - self.sessions[self._finished[0]]['finished_at'] > self.session_ttl):
+            session_id = self._finished.popleft()
+            del self.sessions[session_id]
+            del self._done[session_id]
+
+    def _persist(self, session: Dict[str, Any], error: Optional[str]) -> None:
+        """Record the session outcome; runs in a worker thread."""
+        if error is not None:
+            self.results_store.finish_session(session['session_id'], 'failed', error)
+            return
+        result = session['result']
+        self.results_store.add_session_results({
+            'session_id': session['session_id'],
+            'patient_id': session['patient_id'],
+            'night_start': session['uploaded_at'],
+            'n_windows': result['n_windows'],
+            'apnea_windows': result.get('apnea_windows'),
+            'prediction': result.get('prediction'),
+            'confidence_score': result.get('confidence_score'),
+        }, result['window_scores'], window_seconds=self.segment_seconds)
+
+
+def summarize_scores(scores: np.ndarray, threshold: float = 0.5) -> Dict[str, Any]:
+    """Summarize per-window apnea probabilities into a session result."""
+    scores = np.asarray(scores, dtype=float)
+    apnea_fraction = float(np.mean(scores > threshold)) if len(scores) else 0.0
+    mean_score = float(np.mean(scores)) if len(scores) else 0.0
+    return {
+        'n_windows': int(len(scores)),
+        'window_scores': scores.tolist(),
+        'apnea_windows': int(np.sum(scores > threshold)),
+        'apnea_window_fraction': apnea_fraction,
+        'prediction': 'Apnea' if mean_score > threshold else 'Normal',
+        'confidence_score': mean_score if mean_score > threshold else 1.0 - mean_score,
+    }
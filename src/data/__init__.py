@@ -1,5 +1,11 @@
 """Data module initialization."""
 
 from .loader import APNEADataLoader, load_dataset_summary
+from .manifest import build_manifest, refresh_manifest, complete_records, plan_shards
+from .quality import compute_window_quality, quality_mask, filter_windows, rejection_rate
 
-__all__ = ['APNEADataLoader', 'load_dataset_summary']
+__all__ = [
+    'APNEADataLoader', 'load_dataset_summary',
+    'build_manifest', 'refresh_manifest', 'complete_records', 'plan_shards',
+    'compute_window_quality', 'quality_mask', 'filter_windows', 'rejection_rate'
+]
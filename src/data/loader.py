@@ -1,10 +1,13 @@
 import numpy as np
 import scipy.io
 from pathlib import Path
-from typing import Tuple, Optional, Dict, List, Any
+from typing import Tuple, Optional, Dict, List, Any, Iterator
 import logging
 import os
 
+from .manifest import MODALITIES, complete_records, refresh_manifest
+from .quality import filter_windows, rejection_rate
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,6 +25,7 @@ class APNEADataLoader:
             data_dir: Path to directory containing APNEA dataset (root with RR, SAT, LABELS)
         """
         self.data_dir = Path(data_dir)
+        self.rejection_rates: Dict[str, float] = {}
         
         if not self.data_dir.exists():
             logger.warning(f"Data directory {self.data_dir} does not exist")
@@ -33,6 +37,22 @@ class APNEADataLoader:
             return []
         mat_files = list(rr_dir.glob('*.mat'))
         return sorted([f.stem for f in mat_files])
+
+    def get_manifest(self, manifest_path: Optional[str] = None, save: bool = False) -> Dict:
+        """
+        Load the header-only dataset manifest, rescanning only changed files.
+
+        Args:
+            manifest_path: Stored manifest to reuse (defaults to one under cache/manifests)
+            save: Write the refreshed manifest back to manifest_path
+        """
+        return refresh_manifest(str(self.data_dir), manifest_path, save=save)
+
+    def get_complete_records(self, modalities: Tuple[str, ...] = MODALITIES,
+                             manifest_path: Optional[str] = None,
+                             save: bool = False) -> List[str]:
+        """Get records that have every requested modality, without decoding any signal."""
+        return complete_records(self.get_manifest(manifest_path, save), modalities)
     
     def load_mat_data(self, record_name: str, subfolder: str) -> Optional[np.ndarray]:
         """Load data from a specific .mat file."""
@@ -59,6 +79,36 @@ class APNEADataLoader:
             logger.error(f"Error loading {path}: {e}")
             return None
 
+    def load_minute_labels(self, record_name: str) -> Optional[np.ndarray]:
+        """Load the per-minute apnea annotation (salida_man_1m, 0/1) of a record."""
+        path = self.data_dir / "LABELS" / f"{record_name}.mat"
+        if not path.exists():
+            return None
+        try:
+            mat = scipy.io.loadmat(str(path), variable_names=['salida_man_1m'])
+        except Exception as e:
+            logger.error(f"Error loading {path}: {e}")
+            return None
+        if 'salida_man_1m' not in mat:
+            return None
+        return mat['salida_man_1m'].flatten().astype(int)
+
+    def window_labels(self, record_name: str, n_samples: int, n_windows: int,
+                      segment_size: int) -> Optional[np.ndarray]:
+        """
+        Per-window labels from the per-minute annotation.
+
+        The RR series is not sampled at a fixed rate, so each window is mapped
+        to the minute containing its centre assuming the series spans the
+        annotated minutes evenly.
+        """
+        minutes = self.load_minute_labels(record_name)
+        if minutes is None or len(minutes) == 0:
+            return None
+        centres = np.arange(n_windows) * segment_size + segment_size / 2
+        index = np.minimum((centres / n_samples * len(minutes)).astype(int), len(minutes) - 1)
+        return minutes[index]
+
     def segment_signal(self, signal: np.ndarray, segment_size: int, overlap: int = 0) -> np.ndarray:
         """Segment 1D signal into windows."""
         if len(signal) < segment_size:
@@ -75,8 +125,20 @@ class APNEADataLoader:
             
         return np.array(segments)
 
-    def get_segmented_dataset(self, record_names: List[str], segment_seconds: int = 60) -> Tuple[np.ndarray, np.ndarray]:
-        """Load and segment records into sequences."""
+    def get_segmented_dataset(self, record_names: List[str], segment_seconds: int = 60,
+                              quality_check: bool = False,
+                              minute_labels: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Load and segment records into sequences.
+
+        When quality_check is set, artifact windows are dropped before they reach
+        feature extraction or the models, and the per-record rejection rate is
+        logged and stored in self.rejection_rates.
+
+        Windows are labelled with the record's group (C=0, D/ND=1) unless
+        minute_labels is set, in which case each window takes the per-minute
+        annotation from LABELS (records without one are skipped).
+        """
         X_segments = []
         y_labels = []
         
@@ -88,17 +150,50 @@ class APNEADataLoader:
             if rr_signal is None or len(rr_signal) < segment_seconds:
                 continue
             
-            # Label from filename prefix: C=0, D/ND=1
-            label = 0 if name.startswith('C') else 1
-            
             # Segment RR signal
             segments = self.segment_signal(rr_signal, segment_seconds)
+            if minute_labels:
+                labels = self.window_labels(name, len(rr_signal), len(segments), segment_seconds)
+                if labels is None:
+                    logger.warning(f"{name}: no per-minute labels, skipping")
+                    continue
+            else:
+                # Label from filename prefix: C=0, D/ND=1
+                labels = np.full(len(segments), 0 if name.startswith('C') else 1)
+            if quality_check and len(segments) > 0:
+                segments, keep = filter_windows(segments, signal_type='rr')
+                labels = labels[keep]
+                self.rejection_rates[name] = rejection_rate(keep)
+                logger.info(f"{name}: rejected {np.sum(~keep)}/{len(keep)} windows "
+                            f"({self.rejection_rates[name]:.1%})")
             if len(segments) > 0:
                 X_segments.extend(segments)
-                y_labels.extend([label] * len(segments))
+                y_labels.extend(labels)
                 
         return np.array(X_segments), np.array(y_labels)
 
+    def iter_segmented_batches(self, record_names: List[str], segment_seconds: int = 60,
+                               batch_size: int = 1024, quality_check: bool = False, *,
+                               minute_labels: bool
+                               ) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Yield (X, y, record_ids) batches one record at a time.
+
+        Only a single record's segments are held in memory, so large held-out
+        sets can be scored with the streaming metrics. X is (batch, segment_seconds).
+
+        The label source must be chosen explicitly: minute_labels=False gives the
+        record group that get_segmented_dataset (and so CNN-LSTM training) uses;
+        minute_labels=True gives the per-minute annotation, which makes per-record
+        AHI errors meaningful but scores a different target than training.
+        """
+        for name in record_names:
+            X, y = self.get_segmented_dataset([name], segment_seconds, quality_check,
+                                              minute_labels)
+            for start in range(0, len(X), batch_size):
+                X_batch = X[start:start + batch_size]
+                yield X_batch, y[start:start + batch_size], np.full(len(X_batch), name)
+
 def load_dataset_summary(data_dir: str) -> Dict:
     """Load summary information for entire dataset."""
     loader = APNEADataLoader(data_dir)
@@ -0,0 +1,176 @@
+"""
+Header-only dataset manifest.
+
+The manifest records, for every record and modality, the variables stored in
+the .mat file (name, shape, MATLAB class) together with file size and mtime.
+It is built with scipy.io.whosmat, so no signal data is decoded, and refreshes
+only re-read files whose size or mtime changed. Manifests are stored under
+cache/manifests by default, never inside the (version-controlled) dataset.
+"""
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import scipy.io
+
+logger = logging.getLogger(__name__)
+
+MODALITIES = ('RR', 'SAT', 'LABELS')
+MANIFEST_VERSION = 1
+DEFAULT_MANIFEST_DIR = 'cache/manifests'
+
+
+def scan_mat_header(path: Path) -> Dict:
+    """
+    Read the variable headers and file stats of a .mat file.
+
+    Returns:
+        Dictionary with 'size', 'mtime' and 'variables' (name, shape, dtype)
+    """
+    stat = path.stat()
+    entry = {'size': stat.st_size, 'mtime': stat.st_mtime, 'variables': [], 'error': None}
+    try:
+        entry['variables'] = [
+            {'name': name, 'shape': list(shape), 'dtype': mat_class}
+            for name, shape, mat_class in scipy.io.whosmat(str(path))
+        ]
+    except Exception as e:
+        logger.error(f"Error reading header of {path}: {e}")
+        entry['error'] = str(e)
+    return entry
+
+
+def build_manifest(data_dir: str, modalities: Sequence[str] = MODALITIES,
+                   previous: Optional[Dict] = None) -> Dict:
+    """
+    Build a manifest for a dataset root containing one folder per modality.
+
+    Args:
+        data_dir: Dataset root (with RR, SAT, LABELS subfolders)
+        modalities: Modality subfolders to scan
+        previous: Earlier manifest; entries whose size and mtime are unchanged
+            are reused without reading the file
+
+    Returns:
+        Manifest dictionary; records[name][modality] is None when missing
+    """
+    data_dir = Path(data_dir)
+    old_records = (previous or {}).get('records', {})
+    records: Dict[str, Dict[str, Optional[Dict]]] = {}
+    rescanned = 0
+
+    for modality in modalities:
+        for path in sorted((data_dir / modality).glob('*.mat')):
+            old = old_records.get(path.stem, {}).get(modality)
+            stat = path.stat()
+            if old and old['size'] == stat.st_size and old['mtime'] == stat.st_mtime:
+                entry = old
+            else:
+                entry = scan_mat_header(path)
+                rescanned += 1
+            records.setdefault(path.stem, {})[modality] = entry
+
+    for modalities_found in records.values():
+        for modality in modalities:
+            modalities_found.setdefault(modality, None)
+
+    logger.info(f"Manifest: {len(records)} records, {rescanned} files scanned")
+    return {
+        'version': MANIFEST_VERSION,
+        'data_dir': str(data_dir),
+        'modalities': list(modalities),
+        'records': dict(sorted(records.items())),
+    }
+
+
+def save_manifest(manifest: Dict, path: str) -> None:
+    """Write a manifest as JSON."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=1)
+
+
+def load_manifest(path: str) -> Optional[Dict]:
+    """Load a manifest, returning None if it is missing or from another version."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest.get('version') != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def default_manifest_path(data_dir: str) -> str:
+    """Manifest file for a dataset root under DEFAULT_MANIFEST_DIR."""
+    digest = hashlib.sha256(str(Path(data_dir).resolve()).encode()).hexdigest()
+    return str(Path(DEFAULT_MANIFEST_DIR) / f'{digest[:16]}.json')
+
+
+def refresh_manifest(data_dir: str, manifest_path: Optional[str] = None,
+                     modalities: Sequence[str] = MODALITIES, save: bool = True) -> Dict:
+    """
+    Load the stored manifest, rescan only changed files and optionally save it back.
+
+    Args:
+        data_dir: Dataset root
+        manifest_path: Manifest file (defaults to default_manifest_path(data_dir))
+        save: Write the refreshed manifest to manifest_path
+    """
+    manifest_path = manifest_path or default_manifest_path(data_dir)
+    manifest = build_manifest(data_dir, modalities, previous=load_manifest(manifest_path))
+    if save:
+        save_manifest(manifest, manifest_path)
+    return manifest
+
+
+def missing_modalities(manifest: Dict) -> Dict[str, List[str]]:
+    """Map each incomplete record to the modalities it lacks or failed to read."""
+    missing = {}
+    for name, entries in manifest['records'].items():
+        absent = [m for m, e in entries.items() if e is None or e['error']]
+        if absent:
+            missing[name] = absent
+    return missing
+
+
+def complete_records(manifest: Dict, modalities: Optional[Sequence[str]] = None) -> List[str]:
+    """Records that have a readable file for every requested modality."""
+    modalities = modalities or manifest['modalities']
+    return [
+        name for name, entries in manifest['records'].items()
+        if all(entries.get(m) and not entries[m]['error'] for m in modalities)
+    ]
+
+
+def record_size(manifest: Dict, record_name: str,
+                modalities: Optional[Sequence[str]] = None) -> int:
+    """Total on-disk bytes of a record, used as a proxy for decoding cost."""
+    entries = manifest['records'][record_name]
+    modalities = modalities or manifest['modalities']
+    return sum(entries[m]['size'] for m in modalities if entries.get(m))
+
+
+def plan_shards(manifest: Dict, n_shards: int, records: Optional[Sequence[str]] = None,
+                modalities: Optional[Sequence[str]] = None) -> List[List[str]]:
+    """
+    Split records into n_shards with balanced total size.
+
+    Uses the longest-processing-time heuristic: largest records first,
+    each assigned to the currently lightest shard.
+    """
+    if n_shards < 1:
+        raise ValueError("n_shards must be at least 1")
+    records = list(records) if records is not None else complete_records(manifest, modalities)
+    shards: List[List[str]] = [[] for _ in range(n_shards)]
+    loads = [0] * n_shards
+    for name in sorted(records, key=lambda r: record_size(manifest, r, modalities), reverse=True):
+        i = loads.index(min(loads))
+        shards[i].append(name)
+        loads[i] += record_size(manifest, name, modalities)
+    return shards
@@ -0,0 +1,146 @@
+"""Vectorized signal-quality gate for windowed RR and SpO2 signals."""
+
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+# Physiological limits and rejection thresholds per signal type.
+# RR intervals are in milliseconds, SpO2 in percent.
+DEFAULT_THRESHOLDS = {
+    'rr': {
+        'min_value': 300.0,        # 200 bpm
+        'max_value': 2000.0,       # 30 bpm
+        'max_range_fraction': 0.05,
+        'ectopic_change': 0.2,     # relative change between successive RRs
+        'max_ectopic_ratio': 0.2,
+        'max_flatline_fraction': 0.15,
+        'max_nan_fraction': 0.1,
+    },
+    'spo2': {
+        'min_value': 50.0,
+        'max_value': 100.0,
+        'max_range_fraction': 0.05,
+        'ectopic_change': None,
+        'max_ectopic_ratio': None,
+        'max_flatline_fraction': 0.9,   # SpO2 legitimately holds values for seconds
+        'max_nan_fraction': 0.1,
+    },
+}
+
+
+def _get_thresholds(signal_type: str, overrides: Optional[Dict] = None) -> Dict:
+    if signal_type not in DEFAULT_THRESHOLDS:
+        raise ValueError(f"Unknown signal type: {signal_type}")
+    thresholds = dict(DEFAULT_THRESHOLDS[signal_type])
+    if overrides:
+        thresholds.update(overrides)
+    return thresholds
+
+
+def longest_flatline(windows: np.ndarray) -> np.ndarray:
+    """
+    Length of the longest run of identical consecutive samples in each window.
+
+    Args:
+        windows: Array of shape (n_windows, window_size)
+
+    Returns:
+        Integer array of shape (n_windows,); 1 means no repeated samples
+    """
+    windows = np.atleast_2d(windows)
+    if windows.shape[1] < 2:
+        return np.ones(windows.shape[0], dtype=int)
+
+    flat = np.diff(windows, axis=1) == 0
+    # Running count of consecutive True values, reset at every False
+    counts = np.cumsum(flat, axis=1)
+    resets = np.maximum.accumulate(np.where(flat, 0, counts), axis=1)
+    return (counts - resets).max(axis=1) + 1
+
+
+def compute_window_quality(
+    windows: np.ndarray,
+    signal_type: str = 'rr',
+    thresholds: Optional[Dict] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Compute per-window quality metrics in a single vectorized pass.
+
+    Args:
+        windows: Array of shape (n_windows, window_size) from segment_signal
+        signal_type: 'rr' (milliseconds) or 'spo2' (percent)
+        thresholds: Optional overrides for DEFAULT_THRESHOLDS[signal_type]
+
+    Returns:
+        Dictionary of metric name -> array of shape (n_windows,)
+    """
+    t = _get_thresholds(signal_type, thresholds)
+    windows = np.atleast_2d(np.asarray(windows, dtype=float))
+    n_windows = windows.shape[0]
+
+    nan_mask = np.isnan(windows)
+    n_valid = np.maximum((~nan_mask).sum(axis=1), 1)
+
+    with np.errstate(invalid='ignore'):
+        out_of_range = (windows < t['min_value']) | (windows > t['max_value'])
+    range_fraction = out_of_range.sum(axis=1) / n_valid
+
+    if t['ectopic_change'] is not None and windows.shape[1] > 1:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rel_change = np.abs(np.diff(windows, axis=1)) / windows[:, :-1]
+        ectopic = np.nan_to_num(rel_change, nan=0.0) > t['ectopic_change']
+        ectopic_ratio = ectopic.sum(axis=1) / (windows.shape[1] - 1)
+    else:
+        ectopic_ratio = np.zeros(n_windows)
+
+    return {
+        'nan_fraction': nan_mask.mean(axis=1) if windows.shape[1] else np.zeros(n_windows),
+        'range_fraction': range_fraction,
+        'ectopic_ratio': ectopic_ratio,
+        'flatline': longest_flatline(windows),
+    }
+
+
+def quality_mask(
+    windows: np.ndarray,
+    signal_type: str = 'rr',
+    thresholds: Optional[Dict] = None
+) -> np.ndarray:
+    """
+    Flag windows that pass every quality check.
+
+    Returns:
+        Boolean array of shape (n_windows,), True for usable windows
+    """
+    t = _get_thresholds(signal_type, thresholds)
+    metrics = compute_window_quality(windows, signal_type, t)
+
+    keep = metrics['nan_fraction'] <= t['max_nan_fraction']
+    keep &= metrics['range_fraction'] <= t['max_range_fraction']
+    keep &= metrics['flatline'] <= t['max_flatline_fraction'] * np.shape(windows)[-1]
+    if t['max_ectopic_ratio'] is not None:
+        keep &= metrics['ectopic_ratio'] <= t['max_ectopic_ratio']
+    return keep
+
+
+def filter_windows(
+    windows: np.ndarray,
+    signal_type: str = 'rr',
+    thresholds: Optional[Dict] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Drop artifact windows before feature extraction.
+
+    Returns:
+        Tuple of (clean windows, boolean keep mask over the input windows)
+    """
+    if len(windows) == 0:
+        return windows, np.zeros(0, dtype=bool)
+    keep = quality_mask(windows, signal_type, thresholds)
+    return windows[keep], keep
+
+
+def rejection_rate(keep: np.ndarray) -> float:
+    """Fraction of windows rejected by the quality gate."""
+    if len(keep) == 0:
+        return 0.0
+    return float(1.0 - np.mean(keep))
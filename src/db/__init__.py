@@ -0,0 +1,5 @@
+"""Database module initialization."""
+
+from .results_store import ResultsStore, SQLiteResultsStore, create_results_store
+
+__all__ = ['ResultsStore', 'SQLiteResultsStore', 'create_results_store']
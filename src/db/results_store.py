@@ -0,0 +1,288 @@
+"""
+Local results store for per-window scores and per-night summaries.
+
+SQLiteResultsStore is the embedded default; other backends (the Postgres
+schema in docs/DATABASE_SCHEMA.md) can implement ResultsStore and be
+registered in RESULTS_STORES.
+"""
+
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_id TEXT NOT NULL,
+    status TEXT NOT NULL CHECK (status IN ('uploaded', 'completed', 'failed', 'cancelled')),
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS window_scores (
+    session_id INTEGER NOT NULL,
+    window_index INTEGER NOT NULL,
+    patient_id TEXT NOT NULL,
+    start_time REAL NOT NULL,
+    score REAL NOT NULL,
+    label INTEGER,
+    PRIMARY KEY (session_id, window_index)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_window_scores_patient_time
+    ON window_scores(patient_id, start_time);
+
+CREATE TABLE IF NOT EXISTS night_summaries (
+    session_id INTEGER PRIMARY KEY,
+    patient_id TEXT NOT NULL,
+    night_start REAL NOT NULL,
+    n_windows INTEGER NOT NULL,
+    apnea_windows INTEGER NOT NULL,
+    apnea_events_per_hour REAL,
+    prediction TEXT NOT NULL CHECK (prediction IN ('Normal', 'Apnea')),
+    confidence_score REAL NOT NULL,
+    model_used TEXT,
+    created_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_night_summaries_patient_start
+    ON night_summaries(patient_id, night_start);
+"""
+
+SUMMARY_COLUMNS = [
+    'session_id', 'patient_id', 'night_start', 'n_windows', 'apnea_windows',
+    'apnea_events_per_hour', 'prediction', 'confidence_score', 'model_used', 'created_at'
+]
+
+
+class ResultsStore(ABC):
+    """Interface for persisting and querying prediction history."""
+
+    @abstractmethod
+    def create_session(self, patient_id: Any) -> int:
+        """Reserve a new, never reused session id in the 'uploaded' state."""
+
+    @abstractmethod
+    def finish_session(self, session_id: int, status: str, error: Optional[str] = None) -> None:
+        """Mark a reserved session as completed, failed or cancelled."""
+
+    @abstractmethod
+    def get_session(self, session_id: int) -> Optional[Dict]:
+        """Session row (status, error, timestamps), or None if unknown."""
+
+    @abstractmethod
+    def add_session_results(self, summary: Dict[str, Any], scores: Sequence[float],
+                            window_seconds: int = 60,
+                            labels: Optional[Sequence[int]] = None) -> None:
+        """Write a session's window scores and summary and mark it completed, atomically."""
+
+    @abstractmethod
+    def add_window_scores(self, session_id: int, patient_id: Any, scores: Sequence[float],
+                          night_start: float, window_seconds: int = 60,
+                          labels: Optional[Sequence[int]] = None) -> int:
+        """Bulk insert per-window scores for a session; returns rows written."""
+
+    @abstractmethod
+    def add_night_summary(self, summary: Dict[str, Any]) -> None:
+        """Insert the summary of one night (session)."""
+
+    @abstractmethod
+    def get_window_scores(self, session_id: Optional[int] = None, patient_id: Any = None,
+                          start: Optional[float] = None, end: Optional[float] = None) -> List[Dict]:
+        """Window scores filtered by session or by patient and time range."""
+
+    @abstractmethod
+    def get_patient_results(self, patient_id: Any, limit: int = 10, offset: int = 0,
+                            sort: str = 'desc') -> List[Dict]:
+        """Paginated night summaries for GET /patients/{id}/results."""
+
+    @abstractmethod
+    def get_patient_history(self, patient_id: Any, start: Optional[float] = None,
+                            end: Optional[float] = None) -> List[Dict]:
+        """Night summaries in a time range, oldest first."""
+
+    @abstractmethod
+    def get_overview(self) -> Dict[str, Any]:
+        """Aggregate statistics for GET /analytics/overview."""
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SQLiteResultsStore(ResultsStore):
+    """
+    SQLite-backed results store.
+
+    The connection may be used from worker threads (the ingestion pipeline
+    persists results off the event loop); a lock serializes access to it.
+    Writes use plain INSERTs, so a duplicate session id raises
+    sqlite3.IntegrityError instead of overwriting another session.
+
+    Args:
+        path: Database file, or ':memory:' for an in-process store
+    """
+
+    def __init__(self, path: str = ':memory:'):
+        if path != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        if path != ':memory:':
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def create_session(self, patient_id):
+        now = time.time()
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO sessions (patient_id, status, created_at, updated_at) "
+                "VALUES (?, 'uploaded', ?, ?)", (str(patient_id), now, now))
+        return cursor.lastrowid
+
+    def finish_session(self, session_id, status, error=None):
+        with self._lock, self.conn:
+            self._set_session_status(session_id, status, error)
+
+    def get_session(self, session_id):
+        row = self._query("SELECT * FROM sessions WHERE session_id = ?", (int(session_id),))
+        return dict(row[0]) if row else None
+
+    def add_session_results(self, summary, scores, window_seconds=60, labels=None):
+        with self._lock, self.conn:
+            if len(scores):
+                self._insert_window_scores(summary['session_id'], summary['patient_id'], scores,
+                                           summary['night_start'], window_seconds, labels)
+                self._insert_summary(summary)
+            self._set_session_status(summary['session_id'], 'completed')
+
+    def add_window_scores(self, session_id, patient_id, scores, night_start,
+                          window_seconds=60, labels=None):
+        with self._lock, self.conn:
+            return self._insert_window_scores(session_id, patient_id, scores, night_start,
+                                              window_seconds, labels)
+
+    def add_night_summary(self, summary):
+        with self._lock, self.conn:
+            self._insert_summary(summary)
+
+    def _set_session_status(self, session_id, status, error=None):
+        cursor = self.conn.execute(
+            "UPDATE sessions SET status = ?, error = ?, updated_at = ? WHERE session_id = ?",
+            (status, error, time.time(), int(session_id)))
+        if cursor.rowcount == 0:
+            raise KeyError(f"Unknown session: {session_id}")
+
+    def _insert_window_scores(self, session_id, patient_id, scores, night_start,
+                              window_seconds, labels):
+        scores = np.asarray(scores, dtype=float)
+        indices = np.arange(len(scores))
+        starts = night_start + indices * window_seconds
+        label_values = [None] * len(scores) if labels is None else [int(v) for v in labels]
+        rows = zip(
+            [int(session_id)] * len(scores), indices.tolist(), [str(patient_id)] * len(scores),
+            starts.tolist(), scores.tolist(), label_values
+        )
+        self.conn.executemany(
+            "INSERT INTO window_scores "
+            "(session_id, window_index, patient_id, start_time, score, label) "
+            "VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return len(scores)
+
+    def _insert_summary(self, summary):
+        row = {col: summary.get(col) for col in SUMMARY_COLUMNS}
+        row['patient_id'] = str(row['patient_id'])
+        if row['created_at'] is None:
+            row['created_at'] = time.time()
+        self.conn.execute(
+            f"INSERT INTO night_summaries ({', '.join(SUMMARY_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(SUMMARY_COLUMNS))})",
+            [row[col] for col in SUMMARY_COLUMNS])
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def get_window_scores(self, session_id=None, patient_id=None, start=None, end=None):
+        if session_id is None and patient_id is None:
+            raise ValueError("Either session_id or patient_id is required")
+        clauses, params = [], []
+        if session_id is not None:
+            clauses.append("session_id = ?")
+            params.append(int(session_id))
+        if patient_id is not None:
+            clauses.append("patient_id = ?")
+            params.append(str(patient_id))
+        clauses, params = self._time_range('start_time', start, end, clauses, params)
+        order = "window_index" if session_id is not None else "start_time"
+        rows = self._query(
+            f"SELECT * FROM window_scores WHERE {' AND '.join(clauses)} ORDER BY {order}", params)
+        return [dict(r) for r in rows]
+
+    def get_patient_results(self, patient_id, limit=10, offset=0, sort='desc'):
+        if sort not in ('asc', 'desc'):
+            raise ValueError(f"Unknown sort order: {sort}")
+        limit = max(1, min(int(limit), 100))
+        rows = self._query(
+            f"SELECT * FROM night_summaries WHERE patient_id = ? "
+            f"ORDER BY night_start {sort.upper()} LIMIT ? OFFSET ?",
+            (str(patient_id), limit, int(offset)))
+        return [dict(r) for r in rows]
+
+    def get_patient_history(self, patient_id, start=None, end=None):
+        clauses, params = self._time_range(
+            'night_start', start, end, ["patient_id = ?"], [str(patient_id)])
+        rows = self._query(
+            f"SELECT * FROM night_summaries WHERE {' AND '.join(clauses)} ORDER BY night_start",
+            params)
+        return [dict(r) for r in rows]
+
+    def get_overview(self):
+        rows = self._query(
+            "SELECT COUNT(DISTINCT patient_id) AS total_patients, "
+            "COUNT(*) AS total_sessions, "
+            "COALESCE(SUM(n_windows), 0) AS total_windows, "
+            "AVG(prediction = 'Apnea') AS apnea_detection_rate "
+            "FROM night_summaries")
+        overview = dict(rows[0])
+        overview['apnea_detection_rate'] = overview['apnea_detection_rate'] or 0.0
+        return overview
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def _time_range(column, start, end, clauses, params):
+        if start is not None:
+            clauses = clauses + [f"{column} >= ?"]
+            params = params + [float(start)]
+        if end is not None:
+            clauses = clauses + [f"{column} < ?"]
+            params = params + [float(end)]
+        return clauses, params
+
+
+RESULTS_STORES = {
+    'sqlite': SQLiteResultsStore,
+}
+
+
+def create_results_store(backend: str = 'sqlite', **kwargs) -> ResultsStore:
+    """Instantiate a registered results store backend."""
+    if backend not in RESULTS_STORES:
+        raise ValueError(f"Unknown results store backend: {backend}")
+    return RESULTS_STORES[backend](**kwargs)
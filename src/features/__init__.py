@@ -0,0 +1,5 @@
+"""Features module initialization."""
+
+from .hrv_features import WINDOW_FEATURES, extract_window_features
+
+__all__ = ['WINDOW_FEATURES', 'extract_window_features']
@@ -0,0 +1,27 @@
+"""Time-domain HRV features computed per RR window."""
+
+import numpy as np
+
+WINDOW_FEATURES = ['mean_rr', 'sdnn', 'rmssd', 'pnn50']
+
+
+def extract_window_features(segments: np.ndarray) -> np.ndarray:
+    """
+    Compute time-domain HRV features for every window at once.
+
+    Args:
+        segments: RR windows in milliseconds, shape (n_windows, window_size)
+
+    Returns:
+        Array of shape (n_windows, len(WINDOW_FEATURES))
+    """
+    segments = np.atleast_2d(np.asarray(segments, dtype=float))
+    if segments.shape[0] == 0:
+        return np.empty((0, len(WINDOW_FEATURES)))
+
+    diffs = np.diff(segments, axis=1)
+    mean_rr = np.nanmean(segments, axis=1)
+    sdnn = np.nanstd(segments, axis=1)
+    rmssd = np.sqrt(np.nanmean(diffs ** 2, axis=1))
+    pnn50 = 100.0 * np.mean(np.abs(diffs) > 50, axis=1)
+    return np.column_stack([mean_rr, sdnn, rmssd, pnn50])
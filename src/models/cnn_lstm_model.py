@@ -3,6 +3,7 @@ from tensorflow.keras import layers, models
 import numpy as np
 import logging
 import os
+from src.models.metrics import evaluate_stream
 
 class SleepApneaCNNLSTMModel:
     def __init__(self, input_shape):
@@ -58,6 +59,22 @@ class SleepApneaCNNLSTMModel:
         """Evaluate the model."""
         return self.model.evaluate(X_test, y_test)
 
+    def evaluate_stream(self, batches, evaluator=None):
+        """
+        Evaluate batch by batch with constant memory.
+
+        batches yields (X, y) or (X, y, record_ids) tuples with X shaped
+        (batch, time_steps) as produced by APNEADataLoader.iter_segmented_batches,
+        or already (batch, time_steps, 1); returns a mergeable StreamingEvaluator.
+        The model is trained on record-group labels, so with per-minute labels
+        (minute_labels=True) accuracy is not comparable to evaluate().
+        """
+        def score(X):
+            if X.ndim == 2:
+                X = X.reshape((X.shape[0], X.shape[1], 1))
+            return self.model.predict(X, verbose=0).ravel()
+        return evaluate_stream(score, batches, evaluator)
+
     def predict(self, X):
         """Predict labels for input data."""
         return (self.model.predict(X) > 0.5).astype(int)
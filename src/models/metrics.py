@@ -0,0 +1,212 @@
+"""
+Streaming evaluation metrics with bounded memory.
+
+Each accumulator is updated batch by batch, holds only fixed-size state
+(counts and histograms, or one row per record) and can be merged with the
+accumulators of other folds or workers.
+"""
+
+import numpy as np
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+
+class StreamingConfusionMatrix:
+    """Confusion matrix accumulated from batches of labels and predictions."""
+
+    def __init__(self, n_classes: int = 2):
+        self.n_classes = n_classes
+        self.matrix = np.zeros((n_classes, n_classes), dtype=np.int64)
+
+    def update(self, y_true: np.ndarray, y_pred: np.ndarray) -> None:
+        y_true = np.asarray(y_true, dtype=np.int64).ravel()
+        y_pred = np.asarray(y_pred, dtype=np.int64).ravel()
+        idx = y_true * self.n_classes + y_pred
+        self.matrix += np.bincount(idx, minlength=self.n_classes ** 2).reshape(
+            self.n_classes, self.n_classes)
+
+    def merge(self, other: 'StreamingConfusionMatrix') -> 'StreamingConfusionMatrix':
+        self.matrix += other.matrix
+        return self
+
+    def report(self) -> Dict:
+        """Per-class precision, recall, F1 and support plus overall accuracy."""
+        tp = np.diag(self.matrix).astype(float)
+        predicted = self.matrix.sum(axis=0)
+        support = self.matrix.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            precision = np.where(predicted > 0, tp / predicted, 0.0)
+            recall = np.where(support > 0, tp / support, 0.0)
+            f1 = np.where(precision + recall > 0,
+                          2 * precision * recall / (precision + recall), 0.0)
+        total = self.matrix.sum()
+        report = {
+            str(c): {
+                'precision': float(precision[c]), 'recall': float(recall[c]),
+                'f1-score': float(f1[c]), 'support': int(support[c])
+            }
+            for c in range(self.n_classes)
+        }
+        report['accuracy'] = float(tp.sum() / total) if total else 0.0
+        return report
+
+
+class StreamingROC:
+    """
+    ROC and precision-recall curves from fixed-bin score histograms.
+
+    Scores are binned on [0, 1]; curves are exact up to the bin width.
+    """
+
+    def __init__(self, n_bins: int = 1000):
+        self.n_bins = n_bins
+        self.pos = np.zeros(n_bins, dtype=np.int64)
+        self.neg = np.zeros(n_bins, dtype=np.int64)
+
+    def update(self, y_true: np.ndarray, scores: np.ndarray) -> None:
+        y_true = np.asarray(y_true).ravel().astype(bool)
+        bins = np.clip((np.asarray(scores, dtype=float).ravel() * self.n_bins).astype(np.int64),
+                       0, self.n_bins - 1)
+        self.pos += np.bincount(bins[y_true], minlength=self.n_bins)
+        self.neg += np.bincount(bins[~y_true], minlength=self.n_bins)
+
+    def merge(self, other: 'StreamingROC') -> 'StreamingROC':
+        if other.n_bins != self.n_bins:
+            raise ValueError("Cannot merge histograms with different bin counts")
+        self.pos += other.pos
+        self.neg += other.neg
+        return self
+
+    def _cumulative(self) -> Tuple[np.ndarray, np.ndarray]:
+        # Sweep thresholds from the highest bin down
+        tp = np.concatenate([[0], np.cumsum(self.pos[::-1])])
+        fp = np.concatenate([[0], np.cumsum(self.neg[::-1])])
+        return tp, fp
+
+    def roc_curve(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (fpr, tpr) at every bin edge."""
+        tp, fp = self._cumulative()
+        return fp / max(fp[-1], 1), tp / max(tp[-1], 1)
+
+    def auc(self) -> float:
+        fpr, tpr = self.roc_curve()
+        return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+
+    def pr_curve(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (precision, recall) at every non-empty threshold."""
+        tp, fp = self._cumulative()
+        keep = (tp + fp) > 0
+        tp, fp = tp[keep], fp[keep]
+        return tp / (tp + fp), tp / max(tp[-1], 1)
+
+    def average_precision(self) -> float:
+        precision, recall = self.pr_curve()
+        return float(np.sum(np.diff(np.concatenate([[0], recall])) * precision))
+
+
+class StreamingAHIError:
+    """
+    Per-record apnea index error.
+
+    Counts true and predicted apnea windows per record and converts them to
+    events per hour, so record-level AHI estimates can be compared without
+    keeping window-level predictions.
+    """
+
+    def __init__(self, window_seconds: int = 60):
+        self.window_seconds = window_seconds
+        self.counts: Dict[str, np.ndarray] = {}  # record -> [n_windows, true, pred]
+
+    def update(self, record_ids: np.ndarray, y_true: np.ndarray, y_pred: np.ndarray) -> None:
+        record_ids = np.asarray(record_ids).ravel()
+        y_true = np.asarray(y_true).ravel()
+        y_pred = np.asarray(y_pred).ravel()
+        records, inverse = np.unique(record_ids, return_inverse=True)
+        n = np.bincount(inverse, minlength=len(records))
+        true = np.bincount(inverse, weights=y_true, minlength=len(records))
+        pred = np.bincount(inverse, weights=y_pred, minlength=len(records))
+        for i, record in enumerate(records.tolist()):
+            row = self.counts.setdefault(str(record), np.zeros(3))
+            row += (n[i], true[i], pred[i])
+
+    def merge(self, other: 'StreamingAHIError') -> 'StreamingAHIError':
+        for record, row in other.counts.items():
+            self.counts.setdefault(record, np.zeros(3))
+            self.counts[record] += row
+        return self
+
+    def per_record(self) -> Dict[str, Dict[str, float]]:
+        hours_per_window = self.window_seconds / 3600.0
+        result = {}
+        for record, (n, true, pred) in sorted(self.counts.items()):
+            hours = n * hours_per_window
+            result[record] = {
+                'true_ahi': float(true / hours),
+                'pred_ahi': float(pred / hours),
+                'error': float((pred - true) / hours),
+            }
+        return result
+
+    def summary(self) -> Dict[str, float]:
+        errors = np.array([r['error'] for r in self.per_record().values()])
+        if len(errors) == 0:
+            return {'n_records': 0, 'mae': 0.0, 'rmse': 0.0, 'bias': 0.0}
+        return {
+            'n_records': int(len(errors)),
+            'mae': float(np.mean(np.abs(errors))),
+            'rmse': float(np.sqrt(np.mean(errors ** 2))),
+            'bias': float(np.mean(errors)),
+        }
+
+
+class StreamingEvaluator:
+    """Confusion matrix, ROC/PR and per-record AHI error updated together."""
+
+    def __init__(self, threshold: float = 0.5, n_bins: int = 1000, window_seconds: int = 60):
+        self.threshold = threshold
+        self.confusion = StreamingConfusionMatrix(n_classes=2)
+        self.roc = StreamingROC(n_bins=n_bins)
+        self.ahi = StreamingAHIError(window_seconds=window_seconds)
+
+    def update(self, y_true: np.ndarray, scores: np.ndarray,
+               record_ids: Optional[np.ndarray] = None) -> None:
+        scores = np.asarray(scores, dtype=float).ravel()
+        y_pred = (scores > self.threshold).astype(int)
+        self.confusion.update(y_true, y_pred)
+        self.roc.update(y_true, scores)
+        if record_ids is not None:
+            self.ahi.update(record_ids, y_true, y_pred)
+
+    def merge(self, other: 'StreamingEvaluator') -> 'StreamingEvaluator':
+        self.confusion.merge(other.confusion)
+        self.roc.merge(other.roc)
+        self.ahi.merge(other.ahi)
+        return self
+
+    def summary(self) -> Dict:
+        return {
+            'report': self.confusion.report(),
+            'confusion_matrix': self.confusion.matrix.copy(),
+            'roc_auc': self.roc.auc(),
+            'average_precision': self.roc.average_precision(),
+            'ahi': self.ahi.summary(),
+        }
+
+
+def evaluate_stream(score_fn: Callable[[np.ndarray], np.ndarray], batches: Iterable[Tuple],
+                    evaluator: Optional[StreamingEvaluator] = None) -> StreamingEvaluator:
+    """
+    Evaluate a scoring function over a stream of batches.
+
+    Args:
+        score_fn: Maps a batch of inputs to apnea probabilities
+        batches: Iterable of (X, y) or (X, y, record_ids) tuples
+        evaluator: Accumulator to update (a new one is created if omitted)
+    """
+    evaluator = evaluator or StreamingEvaluator()
+    for batch in batches:
+        X, y = batch[0], batch[1]
+        record_ids = batch[2] if len(batch) > 2 else None
+        if len(y) == 0:
+            continue
+        evaluator.update(y, score_fn(X), record_ids)
+    return evaluator
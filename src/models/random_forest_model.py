@@ -7,14 +7,34 @@ from sklearn.metrics import classification_report, confusion_matrix
 import pickle
 import os
 import logging
+from src.models.metrics import evaluate_stream
+
+# Record labels in extracted_features.csv: C (control) vs D / ND (apnea groups)
+APNEA_LABELS = ('D', 'ND')
+CONTROL_LABELS = ('C',)
+
+
+def binary_labels(y):
+    """Map record labels to 0 (control) / 1 (apnea); numeric labels pass through."""
+    y = np.asarray(y)
+    if y.dtype.kind in 'biu':
+        return y.astype(int)
+    y = y.astype(str)
+    unknown = ~np.isin(y, APNEA_LABELS + CONTROL_LABELS)
+    if unknown.any():
+        raise ValueError(f"Unknown labels: {sorted(set(y[unknown]))}")
+    return np.isin(y, APNEA_LABELS).astype(int)
+
 
 class SleepApneaRFModel:
-    def __init__(self, n_estimators=100, max_depth=None, random_state=42):
+    def __init__(self, n_estimators=100, max_depth=None, random_state=42, **rf_params):
+        """Extra keyword arguments (e.g. tuned max_features) go to RandomForestClassifier."""
         self.model = RandomForestClassifier(
             n_estimators=n_estimators,
             max_depth=max_depth,
             random_state=random_state,
-            class_weight='balanced'
+            class_weight='balanced',
+            **rf_params
         )
         self.scaler = StandardScaler()
         self.logger = logging.getLogger(__name__)
@@ -43,6 +63,23 @@ class SleepApneaRFModel:
         cm = confusion_matrix(y_test, y_pred)
         return report, cm
 
+    def predict_apnea_proba(self, X):
+        """Probability of apnea: the summed probability of every apnea class."""
+        apnea = binary_labels(self.model.classes_) == 1
+        return self.model.predict_proba(X)[:, apnea].sum(axis=1)
+
+    def evaluate_stream(self, batches, evaluator=None):
+        """
+        Evaluate batch by batch with constant memory.
+
+        batches yields scaled (X, y) or (X, y, record_ids) tuples with the
+        training labels ('C'/'D'/'ND' or 0/1); metrics are apnea vs control, so
+        accuracy is not comparable to the three-class report of evaluate().
+        Returns a StreamingEvaluator that can be merged with other folds.
+        """
+        binary = ((batch[0], binary_labels(batch[1])) + tuple(batch[2:]) for batch in batches)
+        return evaluate_stream(self.predict_apnea_proba, binary, evaluator)
+
     def save_model(self, path):
         """Save the model and scaler to a pickle file."""
         os.makedirs(os.path.dirname(path), exist_ok=True)
@@ -1,12 +1,20 @@
 import pandas as pd
 import numpy as np
 import argparse
+import json
 import logging
 from sklearn.model_selection import StratifiedKFold
+import src.data.loader as loader_module
+import src.data.quality as quality_module
+import src.models.random_forest_model as rf_module
+import src.models.cnn_lstm_model as cnn_lstm_module
 from src.models.random_forest_model import SleepApneaRFModel
 from src.models.cnn_lstm_model import SleepApneaCNNLSTMModel
 from src.data.loader import APNEADataLoader
+from src.data.manifest import default_manifest_path
+from src.utils.cache import ExperimentCache, copy_path, fingerprint_file, fingerprint_manifest, hash_parts, source_version
 import os
+import sys
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
@@ -15,20 +23,42 @@ import matplotlib.pyplot as plt
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def train_rf(data_path, model_output_path):
+def restore_run(cache, run_key, model_name, model_output_path):
+    """Copy a cached model to model_output_path and return the run metadata, or None on a miss."""
+    meta = cache.load_meta('runs', run_key)
+    artifact = cache.path('runs', run_key) / model_name
+    if meta is None or not artifact.exists():
+        return None
+    copy_path(artifact, model_output_path)
+    return meta
+
+def train_rf(data_path, model_output_path, cache_dir=None, rf_params=None, n_splits=5):
     """Train and evaluate Random Forest model using 5-fold cross-validation."""
+    rf_params = rf_params or {}
+    cache = ExperimentCache(cache_dir) if cache_dir else None
+    # Always a pickle, whatever the output extension
+    model_name = 'model.pkl'
+    if cache:
+        run_key = hash_parts(
+            'rf', fingerprint_file(data_path), rf_params, n_splits, model_name,
+            source_version(rf_module, sys.modules[__name__]))
+        meta = restore_run(cache, run_key, model_name, model_output_path)
+        if meta is not None:
+            logger.info(f"Cache hit for RF run {run_key[:12]}, reusing saved model")
+            return meta['fold_reports']
+
     logger.info(f"Loading data from {data_path}")
     df = pd.read_csv(data_path)
     
-    rf_wrapper = SleepApneaRFModel()
+    rf_wrapper = SleepApneaRFModel(**rf_params)
     X, y = rf_wrapper.preprocess(df)
     
-    skf = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
+    skf = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
     
     fold_reports = []
     
     for fold, (train_idx, val_idx) in enumerate(skf.split(X, y)):
-        logger.info(f"Training fold {fold + 1}/5")
+        logger.info(f"Training fold {fold + 1}/{n_splits}")
         X_train, X_val = X[train_idx], X[val_idx]
         y_train, y_val = y.iloc[train_idx], y.iloc[val_idx]
         
@@ -42,25 +72,82 @@ def train_rf(data_path, model_output_path):
     logger.info("Training final model on full dataset...")
     rf_wrapper.train(X, y)
     rf_wrapper.save_model(model_output_path)
+
+    if cache:
+        cache.save_files('runs', run_key, {model_name: model_output_path},
+                         meta={'fold_reports': fold_reports, 'rf_params': rf_params})
     
     return fold_reports
 
-def train_cnn_lstm(data_dir, model_output_path, segment_seconds=60, epochs=20):
-    """Train and evaluate CNN-LSTM model."""
-    logger.info(f"Loading and segmenting data from {data_dir}")
-    loader = APNEADataLoader(data_dir)
+# Record split and quality gate used for the CNN-LSTM segments (part of their cache key)
+SEGMENT_SPLIT = {'n_splits': 5, 'shuffle': True, 'random_state': 42, 'quality_check': True}
+
+def segments_cache_key(loader, cache, segment_seconds=60):
+    """Cache key of the CNN-LSTM segments, computed from file headers only."""
+    # Keep the incremental manifest next to the cache it feeds
+    manifest_path = cache.root / 'manifests' / os.path.basename(default_manifest_path(str(loader.data_dir)))
+    manifest = loader.get_manifest(str(manifest_path), save=True)
+    return hash_parts(
+        'segments', fingerprint_manifest(manifest), segment_seconds,
+        SEGMENT_SPLIT, source_version(loader_module, quality_module, sys.modules[__name__]))
+
+def load_cnn_lstm_segments(loader, segment_seconds=60, cache=None, segments_key=None):
+    """Split records and segment them, reusing cached arrays when the inputs are unchanged."""
+    if cache:
+        segments_key = segments_key or segments_cache_key(loader, cache, segment_seconds)
+        arrays = cache.load_arrays('segments', segments_key)
+        if arrays is not None:
+            logger.info(f"Cache hit for segments {segments_key[:12]}")
+            return arrays['X_train'], arrays['y_train'], arrays['X_test'], arrays['y_test'], segments_key
+
     records = loader.get_record_list()
     
     # Stratified split by record to avoid data leakage
-    train_recs, test_recs = StratifiedKFold(n_splits=5, shuffle=True, random_state=42).split(records, [1 if 'apn' in r.lower() else 0 for r in records]).__next__()
+    skf = StratifiedKFold(n_splits=SEGMENT_SPLIT['n_splits'], shuffle=SEGMENT_SPLIT['shuffle'],
+                          random_state=SEGMENT_SPLIT['random_state'])
+    train_recs, test_recs = skf.split(records, [1 if 'apn' in r.lower() else 0 for r in records]).__next__()
     
     train_record_names = [records[i] for i in train_recs]
     test_record_names = [records[i] for i in test_recs]
     
     logger.info("Loading training segments...")
-    X_train, y_train = loader.get_segmented_dataset(train_record_names, segment_seconds=segment_seconds)
+    X_train, y_train = loader.get_segmented_dataset(train_record_names, segment_seconds=segment_seconds,
+                                                    quality_check=SEGMENT_SPLIT['quality_check'])
     logger.info("Loading testing segments...")
-    X_test, y_test = loader.get_segmented_dataset(test_record_names, segment_seconds=segment_seconds)
+    X_test, y_test = loader.get_segmented_dataset(test_record_names, segment_seconds=segment_seconds,
+                                                  quality_check=SEGMENT_SPLIT['quality_check'])
+    if loader.rejection_rates:
+        logger.info(f"Quality gate rejected {np.mean(list(loader.rejection_rates.values())):.1%} "
+                    f"of windows per record on average")
+
+    if cache:
+        cache.save_arrays('segments', segments_key, meta={'rejection_rates': loader.rejection_rates},
+                          X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test)
+    return X_train, y_train, X_test, y_test, segments_key
+
+def train_cnn_lstm(data_dir, model_output_path, segment_seconds=60, epochs=20, cache_dir=None):
+    """Train and evaluate CNN-LSTM model."""
+    cache = ExperimentCache(cache_dir) if cache_dir else None
+    model_name = 'model' + os.path.splitext(model_output_path)[1]
+
+    loader = APNEADataLoader(data_dir)
+    segments_key = None
+    if cache:
+        # Check the run before loading segments so a full hit skips reading them
+        segments_key = segments_cache_key(loader, cache, segment_seconds)
+        # Keras picks the save format from the extension, so it is part of the key
+        run_key = hash_parts(
+            'cnn_lstm', segments_key, epochs, model_name,
+            source_version(cnn_lstm_module, sys.modules[__name__]))
+        meta = restore_run(cache, run_key, model_name, model_output_path)
+        if meta is not None:
+            logger.info(f"Cache hit for CNN-LSTM run {run_key[:12]}, reusing saved model")
+            logger.info(f"CNN-LSTM Test Accuracy: {meta['accuracy']:.4f}")
+            return meta['accuracy']
+
+    logger.info(f"Loading and segmenting data from {data_dir}")
+    X_train, y_train, X_test, y_test, segments_key = load_cnn_lstm_segments(
+        loader, segment_seconds, cache, segments_key)
     
     # Reshape for CNN-LSTM: (samples, time_steps, features)
     X_train = X_train.reshape((X_train.shape[0], X_train.shape[1], 1))
@@ -72,6 +159,10 @@ def train_cnn_lstm(data_dir, model_output_path, segment_seconds=60, epochs=20):
     
     loss, acc = model_wrapper.evaluate(X_test, y_test)
     logger.info(f"CNN-LSTM Test Accuracy: {acc:.4f}")
+
+    if cache:
+        cache.save_files('runs', run_key, {model_name: model_output_path},
+                         meta={'accuracy': float(acc), 'loss': float(loss), 'epochs': epochs})
     return acc
 
 if __name__ == "__main__":
@@ -79,14 +170,22 @@ if __name__ == "__main__":
     parser.add_argument("--model_type", type=str, default="rf", help="Type of model to train (rf)")
     parser.add_argument("--data_path", type=str, default="processed_data/extracted_features.csv", help="Path to feature CSV")
     parser.add_argument("--output_path", type=str, default="models/rf_baseline.pkl", help="Path to save model")
+    parser.add_argument("--cache_dir", type=str, default="cache/experiments", help="Experiment cache directory")
+    parser.add_argument("--no_cache", action="store_true", help="Always retrain, ignoring the experiment cache")
+    parser.add_argument("--rf_params", type=str, default=None, help="Tuning results JSON from src.models.tune")
     
     args = parser.parse_args()
+    cache_dir = None if args.no_cache else args.cache_dir
     
     if args.model_type == "rf":
-        train_rf(args.data_path, args.output_path)
+        rf_params = None
+        if args.rf_params:
+            with open(args.rf_params) as f:
+                rf_params = json.load(f)['best_params']
+        train_rf(args.data_path, args.output_path, cache_dir=cache_dir, rf_params=rf_params)
     elif args.model_type == "cnn_lstm":
         # For CNN-LSTM, data_path is expected to be the raw data directory
         raw_data_dir = "APNEA HRV+SPO2 DATASET/HuGCDN2014-OXI"
-        train_cnn_lstm(raw_data_dir, args.output_path)
+        train_cnn_lstm(raw_data_dir, args.output_path, cache_dir=cache_dir)
     else:
         logger.error(f"Unsupported model type: {args.model_type}")
@@ -0,0 +1,222 @@
+"""
+Successive-halving hyperparameter search for the Random Forest baseline.
+
+The number of trees is the budget: every candidate starts with a small forest
+per fold, the best 1/eta of candidates survive each rung, and survivors grow
+their existing forests with warm_start instead of refitting from scratch.
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import StratifiedKFold
+from sklearn.utils.class_weight import compute_class_weight
+
+import src.models.random_forest_model as rf_module
+from src.models.random_forest_model import SleepApneaRFModel
+from src.utils.cache import ExperimentCache, fingerprint_file, hash_parts, source_version
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_GRID = {
+    'max_depth': [None, 5, 10, 20],
+    'max_features': ['sqrt', 'log2', 0.5],
+    'min_samples_leaf': [1, 2, 4],
+}
+
+
+def expand_grid(grid):
+    """Expand a parameter grid into a list of configurations."""
+    keys = sorted(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def load_folds(data_path, n_splits=5, random_state=42, cache_dir=None):
+    """
+    Scale the feature CSV and assign every sample to a validation fold.
+
+    Returns:
+        Tuple of (X, y, fold) where fold[i] is the validation fold of sample i.
+        The arrays are cached by data fingerprint when cache_dir is given.
+    """
+    cache = ExperimentCache(cache_dir) if cache_dir else None
+    if cache:
+        # preprocess() lives in the RF module, so its source is part of the key
+        key = hash_parts('rf_folds', fingerprint_file(data_path), n_splits, random_state,
+                         source_version(rf_module))
+        arrays = cache.load_arrays('folds', key)
+        if arrays is not None:
+            logger.info(f"Cache hit for fold data {key[:12]}")
+            return arrays['X'], arrays['y'], arrays['fold']
+
+    df = pd.read_csv(data_path)
+    X, y = SleepApneaRFModel().preprocess(df)
+    y = np.asarray(y)
+    if y.dtype == object:
+        # String labels ('C', 'D', 'ND'); keep them loadable without pickle
+        y = y.astype(str)
+    fold = np.empty(len(y), dtype=int)
+    skf = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    for i, (_, val_idx) in enumerate(skf.split(X, y)):
+        fold[val_idx] = i
+
+    if cache:
+        cache.save_arrays('folds', key, X=X, y=y, fold=fold)
+    return X, y, fold
+
+
+def _grow_and_score(model, n_estimators, X_train, y_train, X_val, y_val, scoring):
+    """Grow a warm-started forest to n_estimators trees and score it on the fold."""
+    start = time.perf_counter()
+    model.set_params(n_estimators=n_estimators)
+    model.fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+    start = time.perf_counter()
+    score = get_scorer(scoring)(model, X_val, y_val)
+    return model, score, fit_time, time.perf_counter() - start
+
+
+def successive_halving(X, y, fold, configs, min_estimators=16, max_estimators=500, eta=3,
+                       scoring='balanced_accuracy', n_jobs=-1, random_state=42):
+    """
+    Run successive halving over configurations with n_estimators as the budget.
+
+    Args:
+        X, y, fold: Feature matrix, labels and validation fold per sample
+        configs: List of RandomForestClassifier parameter dicts
+        min_estimators: Trees per forest at the first rung
+        max_estimators: Upper bound on trees per forest
+        eta: Keep the top 1/eta candidates and multiply trees by eta per rung
+        scoring: sklearn scorer name used to rank candidates
+        n_jobs: Parallel threads across candidates x folds
+
+    Returns:
+        Dictionary with the best configuration, rung history and timings
+    """
+    if eta < 2:
+        raise ValueError("eta must be at least 2")
+    n_folds = int(fold.max()) + 1
+    splits = [(X[fold != k], y[fold != k], X[fold == k], y[fold == k]) for k in range(n_folds)]
+
+    # Explicit 'balanced' weights per fold; the preset is not meant for warm_start
+    classes = np.unique(y)
+    fold_weights = [
+        dict(zip(classes, compute_class_weight('balanced', classes=classes, y=y_train)))
+        for _, y_train, _, _ in splits
+    ]
+
+    candidates = [{
+        'params': params,
+        'models': [
+            RandomForestClassifier(warm_start=True, class_weight=fold_weights[k],
+                                   random_state=random_state, n_estimators=min_estimators, **params)
+            for k in range(n_folds)
+        ],
+    } for params in configs]
+
+    history = []
+    trees_fitted = 0
+    n_estimators = min_estimators
+    # Threads: forests stay in this process between rungs instead of being
+    # pickled to and from worker processes, and tree fitting releases the GIL
+    with Parallel(n_jobs=n_jobs, prefer="threads") as parallel:
+        while True:
+            rung_start = time.perf_counter()
+            results = parallel(
+                delayed(_grow_and_score)(model, n_estimators, *splits[k], scoring)
+                for c in candidates for k, model in enumerate(c['models'])
+            )
+            fit_time = score_time = 0.0
+            for i, c in enumerate(candidates):
+                fold_results = results[i * n_folds:(i + 1) * n_folds]
+                c['models'] = [r[0] for r in fold_results]
+                c['score'] = float(np.mean([r[1] for r in fold_results]))
+                fit_time += sum(r[2] for r in fold_results)
+                score_time += sum(r[3] for r in fold_results)
+            trees_added = n_estimators - history[-1]['n_estimators'] if history else n_estimators
+            trees_fitted += trees_added * len(candidates) * n_folds
+
+            candidates.sort(key=lambda c: c['score'], reverse=True)
+            history.append({
+                'n_estimators': n_estimators,
+                'n_candidates': len(candidates),
+                'best_score': candidates[0]['score'],
+                'wall_time_sec': time.perf_counter() - rung_start,
+                'fit_time_sec': fit_time,
+                'score_time_sec': score_time,
+            })
+            logger.info(f"Rung {len(history)}: {len(candidates)} candidates x {n_folds} folds at "
+                        f"{n_estimators} trees, best {scoring}={candidates[0]['score']:.4f}")
+
+            if len(candidates) == 1 or n_estimators >= max_estimators:
+                break
+            candidates = candidates[:max(1, len(candidates) // eta)]
+            n_estimators = min(n_estimators * eta, max_estimators)
+
+    best = candidates[0]
+    return {
+        'best_params': dict(best['params'], n_estimators=n_estimators),
+        'best_score': best['score'],
+        'scoring': scoring,
+        'n_configs': len(configs),
+        'n_folds': n_folds,
+        'rungs': history,
+        'trees_fitted': trees_fitted,
+        'full_grid_trees': len(configs) * n_folds * max_estimators,
+    }
+
+
+def tune_rf(data_path, output_path, grid=None, n_splits=5, min_estimators=16,
+            max_estimators=500, eta=3, scoring='balanced_accuracy', n_jobs=-1, cache_dir=None):
+    """Tune the Random Forest and write the best configuration with a timing breakdown."""
+    total_start = time.perf_counter()
+
+    start = time.perf_counter()
+    X, y, fold = load_folds(data_path, n_splits=n_splits, cache_dir=cache_dir)
+    load_time = time.perf_counter() - start
+
+    configs = expand_grid(grid or DEFAULT_GRID)
+    logger.info(f"Tuning {len(configs)} configurations with successive halving")
+    result = successive_halving(X, y, fold, configs, min_estimators=min_estimators,
+                                max_estimators=max_estimators, eta=eta, scoring=scoring,
+                                n_jobs=n_jobs)
+    result['timing'] = {
+        'load_folds_sec': load_time,
+        'search_sec': sum(r['wall_time_sec'] for r in result['rungs']),
+        'total_sec': time.perf_counter() - total_start,
+    }
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(result, f, indent=1)
+    logger.info(f"Best configuration {result['best_params']} ({scoring}={result['best_score']:.4f}), "
+                f"{result['trees_fitted']}/{result['full_grid_trees']} trees of a full grid, "
+                f"saved to {output_path}")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune the Random Forest with successive halving")
+    parser.add_argument("--data_path", type=str, default="processed_data/extracted_features.csv", help="Path to feature CSV")
+    parser.add_argument("--output_path", type=str, default="models/rf_tuning.json", help="Path to save tuning results")
+    parser.add_argument("--min_estimators", type=int, default=16, help="Trees per forest at the first rung")
+    parser.add_argument("--max_estimators", type=int, default=500, help="Maximum trees per forest")
+    parser.add_argument("--eta", type=int, default=3, help="Halving factor")
+    parser.add_argument("--scoring", type=str, default="balanced_accuracy", help="sklearn scorer name")
+    parser.add_argument("--n_jobs", type=int, default=-1, help="Parallel threads across candidates and folds")
+    parser.add_argument("--cache_dir", type=str, default="cache/experiments", help="Experiment cache directory")
+
+    args = parser.parse_args()
+    tune_rf(args.data_path, args.output_path, min_estimators=args.min_estimators,
+            max_estimators=args.max_estimators, eta=args.eta, scoring=args.scoring,
+            n_jobs=args.n_jobs, cache_dir=args.cache_dir)
@@ -1,5 +1,6 @@
 """Utilities module initialization."""
 
 from .helpers import normalize_signal, segment_signal, calculate_snr
+from .cache import ExperimentCache
 
-__all__ = ['normalize_signal', 'segment_signal', 'calculate_snr']
+__all__ = ['normalize_signal', 'segment_signal', 'calculate_snr', 'ExperimentCache']
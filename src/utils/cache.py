@@ -0,0 +1,131 @@
+"""
+Content-addressed cache for training runs and their intermediate arrays.
+
+Entries live under <root>/<stage>/<key>/ where key is a hash of everything
+that determines the result: the input data fingerprint, segmentation and
+feature parameters, model hyperparameters and the relevant source code.
+"""
+
+import hashlib
+import json
+import logging
+import shutil
+import uuid
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def hash_parts(*parts: Any) -> str:
+    """Stable SHA-256 over JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def fingerprint_file(path: str) -> str:
+    """Hash of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint_manifest(manifest: Dict) -> str:
+    """Hash of a dataset manifest's records (headers, sizes and mtimes)."""
+    return hash_parts(manifest['modalities'], manifest['records'])
+
+
+def source_version(*modules: ModuleType) -> str:
+    """Hash of the source files of the given modules."""
+    digest = hashlib.sha256()
+    for module in modules:
+        digest.update(Path(module.__file__).read_bytes())
+    return digest.hexdigest()
+
+
+class ExperimentCache:
+    """
+    Filesystem cache keyed by content hashes.
+
+    Args:
+        root: Cache directory
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def path(self, stage: str, key: str) -> Path:
+        return self.root / stage / key
+
+    def has(self, stage: str, key: str) -> bool:
+        return (self.path(stage, key) / 'meta.json').exists()
+
+    def load_meta(self, stage: str, key: str) -> Optional[Dict]:
+        if not self.has(stage, key):
+            return None
+        with open(self.path(stage, key) / 'meta.json') as f:
+            return json.load(f)
+
+    def load_arrays(self, stage: str, key: str) -> Optional[Dict[str, np.ndarray]]:
+        """Load arrays saved with save_arrays, or None on a miss."""
+        if not self.has(stage, key):
+            return None
+        with np.load(self.path(stage, key) / 'arrays.npz') as data:
+            return {name: data[name] for name in data.files}
+
+    def save_arrays(self, stage: str, key: str, meta: Optional[Dict] = None,
+                    **arrays: np.ndarray) -> Path:
+        """Store named arrays under a key."""
+        def write(tmp: Path):
+            np.savez(tmp / 'arrays.npz', **arrays)
+        return self._commit(stage, key, meta, write)
+
+    def save_files(self, stage: str, key: str, files: Dict[str, str],
+                   meta: Optional[Dict] = None) -> Path:
+        """Copy files or directories (e.g. saved models) into the cache."""
+        def write(tmp: Path):
+            for name, src in files.items():
+                copy_path(src, tmp / name)
+        return self._commit(stage, key, meta, write)
+
+    def _commit(self, stage: str, key: str, meta: Optional[Dict], write) -> Path:
+        # Write into a scratch directory and rename it into place, so readers
+        # never see partial entries. Entries are immutable: keys are content
+        # hashes, so if another writer committed the same key first its entry
+        # is equivalent and ours is discarded instead of replacing it under
+        # concurrent readers.
+        final = self.path(stage, key)
+        tmp = self.root / stage / f".tmp-{key}-{uuid.uuid4().hex}"
+        tmp.mkdir(parents=True)
+        try:
+            write(tmp)
+            with open(tmp / 'meta.json', 'w') as f:
+                json.dump(meta or {}, f, indent=1, default=str)
+            try:
+                tmp.rename(final)
+            except OSError:
+                if not final.exists():
+                    raise
+                logger.info(f"{stage}/{key[:12]} was cached concurrently, keeping existing entry")
+                return final
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        logger.info(f"Cached {stage}/{key[:12]}")
+        return final
+
+
+def copy_path(src: str, dst: Path) -> None:
+    """Copy a file or a directory tree, creating parent directories."""
+    src, dst = Path(src), Path(dst)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if src.is_dir():
+        if dst.exists():
+            shutil.rmtree(dst)
+        shutil.copytree(src, dst)
+    else:
+        shutil.copy2(src, dst)
@@ -0,0 +1,21 @@
+"""Shared test fixtures."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def feature_csv(tmp_path):
+    """Create a small feature CSV in the extracted_features.csv layout."""
+    rng = np.random.default_rng(0)
+    labels = np.repeat(['C', 'D'], 30)
+    df = pd.DataFrame({
+        'filename': [f'{l}{i}.mat' for i, l in enumerate(labels)],
+        'label': labels,
+        'mean_rr': np.where(labels == 'C', 900, 800) + rng.normal(0, 30, 60),
+        'sdnn': rng.normal(80, 10, 60),
+    })
+    path = tmp_path / "features.csv"
+    df.to_csv(path, index=False)
+    return str(path)
@@ -0,0 +1,75 @@
+"""Tests for the content-addressed experiment cache."""
+
+import numpy as np
+import src.utils.helpers as helpers_module
+from src.utils.cache import (
+    ExperimentCache, fingerprint_file, fingerprint_manifest, hash_parts, source_version
+)
+
+
+class TestKeys:
+    """Test cases for cache key helpers."""
+
+    def test_hash_parts_stable(self):
+        """Test keys ignore dict ordering but not values."""
+        assert hash_parts({'a': 1, 'b': 2}, 60) == hash_parts({'b': 2, 'a': 1}, 60)
+        assert hash_parts({'a': 1}, 60) != hash_parts({'a': 1}, 30)
+
+    def test_fingerprint_file(self, tmp_path):
+        """Test file fingerprints follow content."""
+        path = tmp_path / "features.csv"
+        path.write_text("a,b\n1,2\n")
+        first = fingerprint_file(str(path))
+        path.write_text("a,b\n1,3\n")
+        assert fingerprint_file(str(path)) != first
+
+    def test_fingerprint_manifest(self):
+        """Test manifest fingerprints change with file stats."""
+        manifest = {'modalities': ['RR'], 'records': {'C1': {'RR': {'size': 10, 'mtime': 1.0}}}}
+        first = fingerprint_manifest(manifest)
+        manifest['records']['C1']['RR']['mtime'] = 2.0
+        assert fingerprint_manifest(manifest) != first
+
+    def test_source_version(self):
+        """Test source hashes are deterministic."""
+        assert source_version(helpers_module) == source_version(helpers_module)
+
+
+class TestExperimentCache:
+    """Test cases for ExperimentCache."""
+
+    def test_arrays_roundtrip(self, tmp_path):
+        """Test cached arrays and metadata are restored."""
+        cache = ExperimentCache(str(tmp_path))
+        key = hash_parts('segments', 60)
+        assert cache.load_arrays('segments', key) is None
+
+        X = np.arange(12, dtype=float).reshape(3, 4)
+        cache.save_arrays('segments', key, meta={'n': 3}, X=X, y=np.array([0, 1, 1]))
+        arrays = cache.load_arrays('segments', key)
+        assert np.array_equal(arrays['X'], X)
+        assert cache.load_meta('segments', key) == {'n': 3}
+
+    def test_files_roundtrip(self, tmp_path):
+        """Test saved model files and directories are cached."""
+        model_file = tmp_path / "rf.pkl"
+        model_file.write_bytes(b"model")
+        model_dir = tmp_path / "saved_model"
+        (model_dir / "variables").mkdir(parents=True)
+        (model_dir / "variables" / "w").write_bytes(b"weights")
+
+        cache = ExperimentCache(str(tmp_path / "cache"))
+        entry = cache.save_files('runs', 'abc', {'model.pkl': str(model_file),
+                                                 'model': str(model_dir)},
+                                 meta={'fold_reports': ['r1']})
+        assert (entry / "model.pkl").read_bytes() == b"model"
+        assert (entry / "model" / "variables" / "w").read_bytes() == b"weights"
+        assert cache.load_meta('runs', 'abc')['fold_reports'] == ['r1']
+
+    def test_existing_entry_kept(self, tmp_path):
+        """Test a second writer of a key keeps the committed entry and no temp dirs."""
+        cache = ExperimentCache(str(tmp_path))
+        first = cache.save_arrays('segments', 'k', X=np.zeros(2))
+        assert cache.save_arrays('segments', 'k', X=np.ones(2)) == first
+        assert np.array_equal(cache.load_arrays('segments', 'k')['X'], np.zeros(2))
+        assert [p.name for p in (tmp_path / 'segments').iterdir()] == ['k']
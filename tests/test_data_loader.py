@@ -2,6 +2,7 @@
 
 import pytest
 import numpy as np
+import scipy.io
 from pathlib import Path
 from src.data.loader import APNEADataLoader
 
@@ -85,3 +86,38 @@ class TestDataLoaderEdgeCases:
         
         assert loader1.data_dir != loader2.data_dir
         assert loader1.sampling_rate != loader2.sampling_rate
+
+
+class TestWindowLabels:
+    """Test per-minute window labels from the LABELS folder."""
+
+    def test_iter_batches_minute_labels(self, tmp_path):
+        """Test streamed batches carry the per-minute annotation, not the record group."""
+        for modality in ['RR', 'LABELS']:
+            (tmp_path / modality).mkdir()
+        # 4 annotated minutes over 8 windows of 30 samples: 2 windows per minute
+        scipy.io.savemat(tmp_path / 'RR' / 'D1.mat', {'RR': np.full((240, 1), 900.0)})
+        scipy.io.savemat(tmp_path / 'LABELS' / 'D1.mat',
+                         {'salida_man': np.zeros((1, 8)), 'salida_man_1m': np.array([[0, 1, 1, 0]])})
+        scipy.io.savemat(tmp_path / 'RR' / 'D2.mat', {'RR': np.full((240, 1), 900.0)})
+
+        loader = APNEADataLoader(str(tmp_path))
+        batches = list(loader.iter_segmented_batches(['D1', 'D2'], segment_seconds=30, batch_size=5,
+                                                     minute_labels=True))
+        assert [len(b[0]) for b in batches] == [5, 3]
+        assert batches[0][0].shape == (5, 30)
+        assert np.concatenate([b[1] for b in batches]).tolist() == [0, 0, 1, 1, 1, 1, 0, 0]
+        # D2 has no annotation and is skipped rather than labelled by its prefix
+        assert set(np.concatenate([b[2] for b in batches])) == {'D1'}
+
+        _, y = loader.get_segmented_dataset(['D2'], segment_seconds=30)
+        assert y.tolist() == [1] * 8
+        record_batches = list(loader.iter_segmented_batches(['D1'], segment_seconds=30,
+                                                            minute_labels=False))
+        assert record_batches[0][1].tolist() == [1] * 8
+
+    def test_label_source_required(self, tmp_path):
+        """Test the label source of streamed batches must be chosen explicitly."""
+        loader = APNEADataLoader(str(tmp_path))
+        with pytest.raises(TypeError):
+            next(loader.iter_segmented_batches(['D1']))
@@ -0,0 +1,245 @@
+"""Tests for the asyncio ingestion pipeline."""
+
+import asyncio
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+import scipy.io
+from src.api.ingestion import IngestionPipeline, LocalUploadStore, summarize_scores
+from src.db.results_store import SQLiteResultsStore
+
+
+def mean_rr_predictor(features):
+    """Score windows with a short mean RR as apnea."""
+    return (features[:, 0] < 800).astype(float)
+
+
+def make_upload(mean_rr=900.0, n_samples=600, seed=0):
+    """Encode an RR series as .mat bytes the way the dataset stores it."""
+    rng = np.random.default_rng(seed)
+    rr = mean_rr + rng.normal(0, 10, size=(n_samples, 1))
+    buffer = io.BytesIO()
+    scipy.io.savemat(buffer, {'RR': rr})
+    return buffer.getvalue()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestIngestionPipeline:
+    """Test cases for IngestionPipeline."""
+
+    def test_session_completes(self, tmp_path):
+        """Test an upload flows through every stage."""
+        async def scenario():
+            store = LocalUploadStore(str(tmp_path))
+            async with IngestionPipeline(store, mean_rr_predictor,
+                                         executor=ThreadPoolExecutor(2)) as pipeline:
+                session_id = await pipeline.submit(456, make_upload(mean_rr=700.0))
+                return await pipeline.wait_for(session_id)
+
+        status = run(scenario())
+        assert status['status'] == 'completed'
+        assert status['progress'] == 100
+        assert status['patient_id'] == 456
+        assert status['result']['n_windows'] == 10
+        assert status['result']['prediction'] == 'Apnea'
+        # Upload is removed once processed
+        assert not any(tmp_path.iterdir())
+
+    def test_process_pool(self, tmp_path):
+        """Test the default process pool runs the CPU-heavy stages."""
+        async def scenario():
+            store = LocalUploadStore(str(tmp_path))
+            async with IngestionPipeline(store, mean_rr_predictor) as pipeline:
+                ids = [await pipeline.submit(1, make_upload(seed=i)) for i in range(3)]
+                return [await pipeline.wait_for(i) for i in ids]
+
+        statuses = run(scenario())
+        assert [s['status'] for s in statuses] == ['completed'] * 3
+        assert all(s['result']['prediction'] == 'Normal' for s in statuses)
+
+    def test_results_persisted(self, tmp_path):
+        """Test completed sessions are written to the results store."""
+        results = SQLiteResultsStore()
+        reserved = results.create_session(1)
+
+        async def scenario():
+            store = LocalUploadStore(str(tmp_path))
+            async with IngestionPipeline(store, mean_rr_predictor, results_store=results,
+                                         executor=ThreadPoolExecutor(2)) as pipeline:
+                session_id = await pipeline.submit(456, make_upload(mean_rr=700.0))
+                return await pipeline.wait_for(session_id)
+
+        status = run(scenario())
+        assert status['session_id'] == reserved + 1
+        assert 'window_scores' not in status['result']
+        assert len(results.get_window_scores(session_id=status['session_id'])) == 10
+        assert results.get_patient_results(456)[0]['prediction'] == 'Apnea'
+        assert results.get_session(status['session_id'])['status'] == 'completed'
+
+    def test_shared_results_store(self, tmp_path):
+        """Test pipelines sharing a store never reuse session ids."""
+        results = SQLiteResultsStore(str(tmp_path / "results.db"))
+
+        async def scenario():
+            first = IngestionPipeline(LocalUploadStore(str(tmp_path / "a")), mean_rr_predictor,
+                                      results_store=results, executor=ThreadPoolExecutor(2))
+            second = IngestionPipeline(LocalUploadStore(str(tmp_path / "b")), mean_rr_predictor,
+                                       results_store=results, executor=ThreadPoolExecutor(2))
+            async with first, second:
+                ids = [await first.submit(1, b'not a mat file'), await second.submit(2, make_upload()),
+                       await first.submit(3, make_upload())]
+                return [await p.wait_for(i) for p, i in zip([first, second, first], ids)]
+
+        statuses = run(scenario())
+        ids = [s['session_id'] for s in statuses]
+        assert len(set(ids)) == 3
+        assert results.get_session(ids[0])['status'] == 'failed'
+        assert [r['patient_id'] for r in results.get_patient_history('2')] == ['2']
+        assert [r['patient_id'] for r in results.get_patient_history('3')] == ['3']
+
+    def test_invalid_upload_fails(self, tmp_path):
+        """Test undecodable uploads end in the failed state."""
+        async def scenario():
+            store = LocalUploadStore(str(tmp_path))
+            async with IngestionPipeline(store, mean_rr_predictor,
+                                         executor=ThreadPoolExecutor(2)) as pipeline:
+                session_id = await pipeline.submit(1, b'not a mat file')
+                return await pipeline.wait_for(session_id)
+
+        status = run(scenario())
+        assert status['status'] == 'failed'
+        assert status['error']
+
+    def test_backpressure(self, tmp_path):
+        """Test full queues reject uploads instead of buffering them."""
+        results = SQLiteResultsStore()
+
+        async def scenario():
+            store = LocalUploadStore(str(tmp_path / "uploads"))
+            pipeline = IngestionPipeline(store, mean_rr_predictor, queue_size=1,
+                                         executor=ThreadPoolExecutor(1), results_store=results)
+            await pipeline.start()
+            # Stop consumers so nothing drains the decode queue
+            for task in pipeline._tasks:
+                task.cancel()
+            await asyncio.gather(*pipeline._tasks, return_exceptions=True)
+
+            await pipeline.submit(1, make_upload(), wait=False)
+            with pytest.raises(asyncio.QueueFull):
+                await pipeline.submit(1, make_upload(), wait=False)
+            blocked = asyncio.create_task(pipeline.submit(1, make_upload()))
+            await asyncio.sleep(0.01)
+            assert not blocked.done()
+            blocked.cancel()
+            await asyncio.gather(blocked, return_exceptions=True)
+            # The cancelled upload leaves no session stuck in 'uploaded'
+            assert list(pipeline.sessions) == [1]
+            assert list(pipeline._done) == [1]
+            await pipeline.stop(drain=False)
+            assert results.get_session(2)['status'] == 'cancelled'
+            return len(list((tmp_path / "uploads").iterdir()))
+
+        # Only the accepted upload reached the store
+        assert run(scenario()) == 1
+
+    def test_cancel_during_reservation(self, tmp_path):
+        """Test an id reserved after the caller was cancelled is released."""
+        release = threading.Event()
+
+        class SlowStore(SQLiteResultsStore):
+            def create_session(self, patient_id):
+                release.wait()
+                return super().create_session(patient_id)
+
+        results = SlowStore()
+
+        async def scenario():
+            store = LocalUploadStore(str(tmp_path))
+            async with IngestionPipeline(store, mean_rr_predictor, results_store=results,
+                                         executor=ThreadPoolExecutor(1)) as pipeline:
+                submitting = asyncio.create_task(pipeline.submit(1, make_upload()))
+                await asyncio.sleep(0.01)
+                submitting.cancel()
+                await asyncio.gather(submitting, return_exceptions=True)
+                release.set()
+                for _ in range(100):
+                    session = results.get_session(1)
+                    if session and session['status'] == 'cancelled':
+                        break
+                    await asyncio.sleep(0.01)
+                assert not pipeline.sessions
+
+        run(scenario())
+        assert results.get_session(1)['status'] == 'cancelled'
+
+    def test_finished_sessions_evicted(self, tmp_path):
+        """Test finished sessions are dropped beyond the retention cap."""
+        async def scenario():
+            store = LocalUploadStore(str(tmp_path))
+            async with IngestionPipeline(store, mean_rr_predictor, max_finished_sessions=2,
+                                         executor=ThreadPoolExecutor(2)) as pipeline:
+                ids = [await pipeline.submit(1, make_upload(seed=i)) for i in range(3)]
+                for session_id in ids:
+                    await pipeline.wait_for(session_id)
+                await pipeline.submit(1, make_upload())
+                return pipeline, ids
+
+        pipeline, ids = run(scenario())
+        with pytest.raises(KeyError):
+            pipeline.get_status(ids[0])
+        assert pipeline.get_status(ids[2])['status'] == 'completed'
+
+    def test_finished_sessions_expire(self, tmp_path):
+        """Test finished sessions are dropped after the TTL."""
+        async def scenario():
+            store = LocalUploadStore(str(tmp_path))
+            async with IngestionPipeline(store, mean_rr_predictor, session_ttl=0.0,
+                                         executor=ThreadPoolExecutor(2)) as pipeline:
+                session_id = await pipeline.submit(1, make_upload())
+                await pipeline.wait_for(session_id)
+                await asyncio.sleep(0.01)
+                return pipeline, session_id
+
+        pipeline, session_id = run(scenario())
+        with pytest.raises(KeyError):
+            pipeline.get_status(session_id)
+        assert not pipeline._done
+
+    def test_predictor_shape_checked(self, tmp_path):
+        """Test predictors must return one score per window."""
+        async def scenario():
+            store = LocalUploadStore(str(tmp_path))
+            async with IngestionPipeline(store, lambda features: [0.5],
+                                         executor=ThreadPoolExecutor(2)) as pipeline:
+                session_id = await pipeline.submit(1, make_upload())
+                return await pipeline.wait_for(session_id)
+
+        status = run(scenario())
+        assert status['status'] == 'failed'
+        assert 'scores for 10 windows' in status['error']
+
+    def test_stop_before_start(self, tmp_path):
+        """Test stopping a pipeline that was never started is a no-op."""
+        pipeline = IngestionPipeline(LocalUploadStore(str(tmp_path)), mean_rr_predictor)
+        run(pipeline.stop())
+
+    def test_unknown_session(self, tmp_path):
+        """Test status lookup for an unknown session."""
+        pipeline = IngestionPipeline(LocalUploadStore(str(tmp_path)), mean_rr_predictor)
+        with pytest.raises(KeyError):
+            pipeline.get_status(99)
+
+
+def test_summarize_scores():
+    """Test session summary from window scores."""
+    summary = summarize_scores(np.array([0.9, 0.8, 0.1, 0.7]))
+    assert summary['n_windows'] == 4
+    assert summary['apnea_window_fraction'] == 0.75
+    assert summary['prediction'] == 'Apnea'
+    assert np.isclose(summary['confidence_score'], 0.625)
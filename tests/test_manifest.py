@@ -0,0 +1,98 @@
+"""Tests for the header-only dataset manifest."""
+
+import os
+
+import numpy as np
+import pytest
+import scipy.io
+import src.data.manifest as manifest_module
+from src.data.loader import APNEADataLoader
+from src.data.manifest import (
+    DEFAULT_MANIFEST_DIR, build_manifest, default_manifest_path, refresh_manifest,
+    load_manifest, missing_modalities, complete_records, plan_shards
+)
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    """Create a small dataset root; D1 lacks SAT and LABELS."""
+    for modality in ['RR', 'SAT', 'LABELS']:
+        (tmp_path / modality).mkdir()
+    for name, n in [('C1', 100), ('C2', 400), ('C3', 200)]:
+        scipy.io.savemat(tmp_path / 'RR' / f'{name}.mat', {'RR': np.ones((n, 1))})
+        scipy.io.savemat(tmp_path / 'SAT' / f'{name}.mat', {'SAT': np.ones((n, 1))})
+        scipy.io.savemat(tmp_path / 'LABELS' / f'{name}.mat', {'salida_man': np.zeros((1, 5))})
+    scipy.io.savemat(tmp_path / 'RR' / 'D1.mat', {'RR': np.ones((300, 1))})
+    return tmp_path
+
+
+class TestManifest:
+    """Test cases for manifest building and queries."""
+
+    def test_build_manifest_headers(self, dataset):
+        """Test variable names, shapes and classes are recorded."""
+        manifest = build_manifest(str(dataset))
+        entry = manifest['records']['C2']['RR']
+        assert entry['variables'] == [{'name': 'RR', 'shape': [400, 1], 'dtype': 'double'}]
+        assert entry['size'] == os.path.getsize(dataset / 'RR' / 'C2.mat')
+        assert entry['error'] is None
+
+    def test_missing_modalities(self, dataset):
+        """Test records without every modality are reported."""
+        manifest = build_manifest(str(dataset))
+        assert missing_modalities(manifest) == {'D1': ['SAT', 'LABELS']}
+        assert complete_records(manifest) == ['C1', 'C2', 'C3']
+        assert complete_records(manifest, ['RR']) == ['C1', 'C2', 'C3', 'D1']
+
+    def test_unreadable_file(self, dataset):
+        """Test corrupt files are flagged rather than raising."""
+        (dataset / 'SAT' / 'C3.mat').write_bytes(b'garbage')
+        manifest = build_manifest(str(dataset))
+        assert manifest['records']['C3']['SAT']['error']
+        assert 'C3' not in complete_records(manifest)
+
+    def test_refresh_rescans_only_changed(self, dataset, monkeypatch):
+        """Test refresh reuses unchanged entries and rescans modified files."""
+        path = str(dataset / 'manifest.json')
+        refresh_manifest(str(dataset), path)
+        assert load_manifest(path)['records']['C1']['RR']['variables'][0]['shape'] == [100, 1]
+
+        scipy.io.savemat(dataset / 'RR' / 'C1.mat', {'RR': np.ones((150, 1))})
+        stat = os.stat(dataset / 'RR' / 'C1.mat')
+        os.utime(dataset / 'RR' / 'C1.mat', (stat.st_atime, stat.st_mtime + 10))
+
+        scanned = []
+        original = manifest_module.scan_mat_header
+        monkeypatch.setattr(manifest_module, 'scan_mat_header',
+                            lambda p: scanned.append(p.name) or original(p))
+        manifest = refresh_manifest(str(dataset), path)
+        assert scanned == ['C1.mat']
+        assert manifest['records']['C1']['RR']['variables'][0]['shape'] == [150, 1]
+
+    def test_plan_shards_balanced(self, dataset):
+        """Test shards cover every complete record with balanced sizes."""
+        manifest = build_manifest(str(dataset))
+        shards = plan_shards(manifest, 2, modalities=['RR'])
+        assert sorted(sum(shards, [])) == ['C1', 'C2', 'C3', 'D1']
+        assert shards[0][0] == 'C2'
+        with pytest.raises(ValueError):
+            plan_shards(manifest, 0)
+
+    def test_loader_complete_records(self, dataset, tmp_path_factory):
+        """Test the loader plans records from the manifest."""
+        loader = APNEADataLoader(str(dataset))
+        before = sorted(dataset.rglob('*'))
+        assert loader.get_complete_records() == ['C1', 'C2', 'C3']
+        # Read-only by default: nothing is written next to the data
+        assert sorted(dataset.rglob('*')) == before
+
+        path = tmp_path_factory.mktemp('manifests') / 'dataset.json'
+        loader.get_complete_records(manifest_path=str(path), save=True)
+        assert load_manifest(str(path))['records'].keys() == {'C1', 'C2', 'C3', 'D1'}
+
+    def test_default_manifest_path(self, dataset):
+        """Test manifests default to the cache directory, keyed by dataset root."""
+        path = default_manifest_path(str(dataset))
+        assert path.startswith(DEFAULT_MANIFEST_DIR)
+        assert path == default_manifest_path(str(dataset / 'RR' / '..'))
+        assert path != default_manifest_path(str(dataset / 'RR'))
@@ -0,0 +1,150 @@
+"""Tests for streaming evaluation metrics."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import average_precision_score, confusion_matrix, roc_auc_score
+from sklearn.model_selection import train_test_split
+from src.models.metrics import (
+    StreamingConfusionMatrix, StreamingROC, StreamingAHIError,
+    StreamingEvaluator, evaluate_stream
+)
+from src.models.random_forest_model import SleepApneaRFModel, binary_labels
+
+FEATURES_CSV = Path(__file__).resolve().parent.parent / 'processed_data' / 'extracted_features.csv'
+
+
+def make_scores(n=5000, seed=0):
+    """Labels with informative scores rounded to the histogram resolution."""
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, 2, n)
+    scores = np.clip(0.3 * y + rng.normal(0.35, 0.2, n), 0, 0.9999)
+    return y, np.floor(scores * 1000) / 1000
+
+
+def batches(*arrays, size=512):
+    for start in range(0, len(arrays[0]), size):
+        yield tuple(a[start:start + size] for a in arrays)
+
+
+class TestStreamingConfusionMatrix:
+    """Test cases for StreamingConfusionMatrix."""
+
+    def test_matches_sklearn(self):
+        """Test batched updates equal the full-array confusion matrix."""
+        y, scores = make_scores()
+        y_pred = (scores > 0.5).astype(int)
+        cm = StreamingConfusionMatrix()
+        for y_b, p_b in batches(y, y_pred):
+            cm.update(y_b, p_b)
+        assert np.array_equal(cm.matrix, confusion_matrix(y, y_pred))
+
+    def test_report(self):
+        """Test precision, recall and accuracy from counts."""
+        cm = StreamingConfusionMatrix()
+        cm.update([0, 0, 1, 1, 1], [0, 1, 1, 1, 0])
+        report = cm.report()
+        assert report['1']['precision'] == pytest.approx(2 / 3)
+        assert report['1']['recall'] == pytest.approx(2 / 3)
+        assert report['0']['support'] == 2
+        assert report['accuracy'] == pytest.approx(0.6)
+
+
+class TestStreamingROC:
+    """Test cases for StreamingROC."""
+
+    def test_auc_and_ap_match_sklearn(self):
+        """Test histogram AUC and AP against exact sklearn values."""
+        y, scores = make_scores()
+        roc = StreamingROC(n_bins=1000)
+        for y_b, s_b in batches(y, scores):
+            roc.update(y_b, s_b)
+        assert roc.auc() == pytest.approx(roc_auc_score(y, scores), abs=1e-6)
+        assert roc.average_precision() == pytest.approx(average_precision_score(y, scores), abs=1e-6)
+
+    def test_merge_equals_single_pass(self):
+        """Test merged fold histograms equal one accumulator over all data."""
+        y, scores = make_scores()
+        whole, left, right = StreamingROC(), StreamingROC(), StreamingROC()
+        whole.update(y, scores)
+        left.update(y[:2000], scores[:2000])
+        right.update(y[2000:], scores[2000:])
+        assert left.merge(right).auc() == whole.auc()
+
+    def test_merge_bin_mismatch(self):
+        """Test merging histograms with different resolutions fails."""
+        with pytest.raises(ValueError):
+            StreamingROC(n_bins=10).merge(StreamingROC(n_bins=20))
+
+
+class TestStreamingAHIError:
+    """Test cases for StreamingAHIError."""
+
+    def test_per_record_error(self):
+        """Test per-record apnea index across batches."""
+        ahi = StreamingAHIError(window_seconds=60)
+        ahi.update(['D1'] * 30, np.ones(30), np.r_[np.ones(15), np.zeros(15)])
+        ahi.update(['D1'] * 30 + ['C1'] * 60, np.r_[np.ones(30), np.zeros(60)],
+                   np.r_[np.ones(30), np.zeros(60)])
+        per_record = ahi.per_record()
+        assert per_record['D1']['true_ahi'] == pytest.approx(60.0)
+        assert per_record['D1']['pred_ahi'] == pytest.approx(45.0)
+        assert per_record['C1']['error'] == 0.0
+        assert ahi.summary()['mae'] == pytest.approx(7.5)
+
+
+class TestEvaluateStream:
+    """Test cases for evaluate_stream."""
+
+    def test_generator_and_merge(self):
+        """Test parallel fold evaluators merge into the single-pass result."""
+        y, scores = make_scores(n=2000)
+        records = np.repeat(['C1', 'D1', 'D2', 'C2'], 500)
+        identity = lambda X: X
+
+        single = evaluate_stream(identity, batches(scores, y, records))
+        fold_a = evaluate_stream(identity, batches(scores[:1000], y[:1000], records[:1000]))
+        fold_b = evaluate_stream(identity, batches(scores[1000:], y[1000:], records[1000:]))
+        merged = StreamingEvaluator().merge(fold_a).merge(fold_b)
+
+        assert np.array_equal(merged.summary()['confusion_matrix'],
+                              single.summary()['confusion_matrix'])
+        assert merged.summary()['roc_auc'] == single.summary()['roc_auc']
+        assert merged.summary()['ahi'] == single.summary()['ahi']
+        assert single.summary()['ahi']['n_records'] == 4
+
+    def test_batches_without_records(self):
+        """Test (X, y) batches skip the AHI accumulator."""
+        y, scores = make_scores(n=100)
+        evaluator = evaluate_stream(lambda X: X, batches(scores, y))
+        assert evaluator.summary()['ahi']['n_records'] == 0
+        assert evaluator.confusion.matrix.sum() == 100
+
+
+class TestRFEvaluateStream:
+    """Test streaming evaluation of the Random Forest on the feature CSV."""
+
+    def test_string_labels(self):
+        """Test C/D/ND labels are scored as control vs apnea."""
+        model = SleepApneaRFModel(n_estimators=20)
+        X, y = model.preprocess(pd.read_csv(FEATURES_CSV))
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y.values, test_size=0.3, random_state=0, stratify=y)
+        model.train(X_train, y_train)
+
+        evaluator = model.evaluate_stream(batches(X_test, y_test, size=8))
+        y_true = binary_labels(y_test)
+        scores = model.predict_apnea_proba(X_test)
+        proba = model.model.predict_proba(X_test)
+        assert np.allclose(scores, 1 - proba[:, list(model.model.classes_).index('C')])
+        assert np.array_equal(evaluator.confusion.matrix,
+                              confusion_matrix(y_true, (scores > 0.5).astype(int), labels=[0, 1]))
+        assert evaluator.confusion.matrix.sum() == len(y_test)
+
+    def test_unknown_labels(self):
+        """Test unexpected labels raise error."""
+        assert list(binary_labels(np.array(['C', 'D', 'ND']))) == [0, 1, 1]
+        with pytest.raises(ValueError, match="Unknown labels"):
+            binary_labels(np.array(['C', 'X']))
@@ -0,0 +1,102 @@
+"""Tests for the signal-quality gate."""
+
+import numpy as np
+import pytest
+from src.data.quality import (
+    longest_flatline, compute_window_quality, quality_mask,
+    filter_windows, rejection_rate
+)
+
+
+def make_rr_windows(n_windows=4, window_size=60, seed=0):
+    """Create clean RR windows around 900 ms."""
+    rng = np.random.default_rng(seed)
+    return 900 + rng.normal(0, 20, size=(n_windows, window_size))
+
+
+class TestLongestFlatline:
+    """Test cases for longest_flatline function."""
+
+    def test_no_flatline(self):
+        """Test windows without repeated samples."""
+        windows = np.arange(20, dtype=float).reshape(2, 10)
+        assert np.array_equal(longest_flatline(windows), [1, 1])
+
+    def test_flatline_runs(self):
+        """Test longest run is found per window."""
+        windows = np.array([
+            [1, 1, 1, 2, 3, 3, 3, 3, 4, 5],
+            [5, 5, 6, 7, 8, 9, 9, 9, 0, 1],
+        ], dtype=float)
+        assert np.array_equal(longest_flatline(windows), [4, 3])
+
+    def test_constant_window(self):
+        """Test fully flat window."""
+        windows = np.full((1, 10), 97.0)
+        assert longest_flatline(windows)[0] == 10
+
+
+class TestQualityGate:
+    """Test cases for quality metrics and filtering."""
+
+    def test_clean_windows_kept(self):
+        """Test clean RR windows pass the gate."""
+        windows = make_rr_windows()
+        assert quality_mask(windows, 'rr').all()
+
+    def test_range_violation_rejected(self):
+        """Test windows with RR dropouts are rejected."""
+        windows = make_rr_windows()
+        windows[1, :10] = 0.0
+        keep = quality_mask(windows, 'rr')
+        assert np.array_equal(keep, [True, False, True, True])
+
+    def test_ectopic_ratio(self):
+        """Test alternating long/short beats raise the ectopic ratio."""
+        windows = make_rr_windows(n_windows=2)
+        windows[0, ::2] = 600.0
+        windows[0, 1::2] = 1200.0
+        metrics = compute_window_quality(windows, 'rr')
+        assert metrics['ectopic_ratio'][0] > 0.9
+        assert metrics['ectopic_ratio'][1] == 0.0
+        assert not quality_mask(windows, 'rr')[0]
+
+    def test_nan_fraction(self):
+        """Test windows with many NaNs are rejected."""
+        windows = make_rr_windows(n_windows=2)
+        windows[0, :30] = np.nan
+        metrics = compute_window_quality(windows, 'rr')
+        assert np.isclose(metrics['nan_fraction'][0], 0.5)
+        assert np.array_equal(quality_mask(windows, 'rr'), [False, True])
+
+    def test_spo2_flatline_rejected(self):
+        """Test flatlined SpO2 windows are rejected."""
+        windows = np.full((2, 100), 96.0)
+        windows[1] += np.linspace(0, 1, 100)
+        assert np.array_equal(quality_mask(windows, 'spo2'), [False, True])
+
+    def test_threshold_overrides(self):
+        """Test thresholds can be overridden per call."""
+        windows = make_rr_windows(n_windows=1)
+        windows[0, 0] = 250.0
+        assert quality_mask(windows, 'rr').all()
+        assert not quality_mask(windows, 'rr', {'max_range_fraction': 0.0}).any()
+
+    def test_unknown_signal_type(self):
+        """Test unknown signal type raises error."""
+        with pytest.raises(ValueError, match="Unknown signal type"):
+            quality_mask(make_rr_windows(), 'ecg')
+
+    def test_filter_windows_and_rejection_rate(self):
+        """Test filtered windows and reported rejection rate."""
+        windows = make_rr_windows()
+        windows[2, :] = 3000.0
+        clean, keep = filter_windows(windows, 'rr')
+        assert clean.shape == (3, 60)
+        assert rejection_rate(keep) == 0.25
+
+    def test_filter_empty(self):
+        """Test filtering an empty window array."""
+        clean, keep = filter_windows(np.array([]), 'rr')
+        assert len(clean) == 0
+        assert rejection_rate(keep) == 0.0
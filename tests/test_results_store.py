@@ -0,0 +1,138 @@
+"""Tests for the local results store."""
+
+import sqlite3
+
+import numpy as np
+import pytest
+from src.db.results_store import SQLiteResultsStore, create_results_store
+
+DAY = 86400.0
+
+
+def make_summary(session_id, patient_id, night_start, prediction='Apnea'):
+    return {
+        'session_id': session_id,
+        'patient_id': patient_id,
+        'night_start': night_start,
+        'n_windows': 480,
+        'apnea_windows': 120,
+        'prediction': prediction,
+        'confidence_score': 0.8,
+    }
+
+
+@pytest.fixture
+def store():
+    with SQLiteResultsStore() as s:
+        yield s
+
+
+class TestSQLiteResultsStore:
+    """Test cases for SQLiteResultsStore."""
+
+    def test_window_scores_roundtrip(self, store):
+        """Test bulk insert and session lookup of window scores."""
+        scores = np.linspace(0, 1, 5)
+        assert store.add_window_scores(1, 456, scores, night_start=1000.0) == 5
+        rows = store.get_window_scores(session_id=1)
+        assert [r['window_index'] for r in rows] == list(range(5))
+        assert np.allclose([r['score'] for r in rows], scores)
+        assert rows[2]['start_time'] == 1120.0
+        assert rows[0]['patient_id'] == '456'
+
+    def test_window_scores_time_range(self, store):
+        """Test patient time-range queries span sessions."""
+        store.add_window_scores(1, 'C1', np.zeros(10), night_start=0.0)
+        store.add_window_scores(2, 'C1', np.ones(10), night_start=DAY)
+        store.add_window_scores(3, 'D1', np.ones(10), night_start=DAY)
+        rows = store.get_window_scores(patient_id='C1', start=DAY - 120, end=DAY + 120)
+        assert [r['session_id'] for r in rows] == [2, 2]
+
+    def test_window_scores_requires_filter(self, store):
+        """Test unfiltered window queries are refused."""
+        with pytest.raises(ValueError):
+            store.get_window_scores()
+
+    def test_patient_results_pagination(self, store):
+        """Test sorting and pagination of night summaries."""
+        for i in range(5):
+            store.add_night_summary(make_summary(i + 1, 456, night_start=i * DAY))
+        store.add_night_summary(make_summary(10, 789, night_start=0.0))
+
+        latest = store.get_patient_results(456, limit=2)
+        assert [r['session_id'] for r in latest] == [5, 4]
+        oldest = store.get_patient_results(456, limit=2, offset=1, sort='asc')
+        assert [r['session_id'] for r in oldest] == [2, 3]
+        with pytest.raises(ValueError):
+            store.get_patient_results(456, sort='sideways')
+
+    def test_patient_history_range(self, store):
+        """Test history is filtered by time range, oldest first."""
+        for i in range(5):
+            store.add_night_summary(make_summary(i + 1, 456, night_start=i * DAY))
+        history = store.get_patient_history(456, start=DAY, end=3 * DAY)
+        assert [r['session_id'] for r in history] == [2, 3]
+
+    def test_overview(self, store):
+        """Test aggregate analytics."""
+        assert store.get_overview()['total_sessions'] == 0
+        store.add_night_summary(make_summary(1, 456, 0.0, prediction='Apnea'))
+        store.add_night_summary(make_summary(2, 456, DAY, prediction='Normal'))
+        store.add_night_summary(make_summary(7, 789, 0.0, prediction='Normal'))
+        overview = store.get_overview()
+        assert overview['total_patients'] == 2
+        assert overview['total_sessions'] == 3
+        assert overview['total_windows'] == 1440
+        assert np.isclose(overview['apnea_detection_rate'], 1 / 3)
+
+    def test_duplicate_session_rejected(self, store):
+        """Test writes never overwrite an existing session."""
+        store.add_night_summary(make_summary(1, 456, 0.0))
+        store.add_window_scores(1, 456, np.zeros(3), night_start=0.0)
+        with pytest.raises(sqlite3.IntegrityError):
+            store.add_night_summary(make_summary(1, 789, 0.0))
+        with pytest.raises(sqlite3.IntegrityError):
+            store.add_window_scores(1, 789, np.ones(3), night_start=0.0)
+        assert store.get_patient_results(456)[0]['session_id'] == 1
+        assert [r['score'] for r in store.get_window_scores(session_id=1)] == [0.0] * 3
+
+    def test_session_lifecycle(self, store):
+        """Test reserved sessions are completed with their results in one step."""
+        session_id = store.create_session(456)
+        assert store.get_session(session_id)['status'] == 'uploaded'
+        store.add_session_results(make_summary(session_id, 456, 0.0), np.ones(4))
+        assert store.get_session(session_id)['status'] == 'completed'
+        assert len(store.get_window_scores(session_id=session_id)) == 4
+
+        failed = store.create_session(456)
+        store.finish_session(failed, 'failed', 'bad upload')
+        assert store.get_session(failed)['error'] == 'bad upload'
+        assert store.get_session(99) is None
+        with pytest.raises(KeyError):
+            store.finish_session(99, 'failed')
+
+    def test_session_results_atomic(self, store):
+        """Test a failed results write leaves neither scores nor summary behind."""
+        session_id = store.create_session(456)
+        store.add_night_summary(make_summary(session_id, 456, 0.0))
+        with pytest.raises(sqlite3.IntegrityError):
+            store.add_session_results(make_summary(session_id, 456, 0.0), np.ones(4))
+        assert store.get_window_scores(session_id=session_id) == []
+        assert store.get_session(session_id)['status'] == 'uploaded'
+
+    def test_file_backed_store_persists(self, tmp_path):
+        """Test results survive reopening and session ids are never reused."""
+        path = str(tmp_path / "db" / "results.db")
+        with create_results_store('sqlite', path=path) as store:
+            first = store.create_session(456)
+            store.add_session_results(make_summary(first, 456, 0.0), np.ones(2))
+            failed = store.create_session(456)
+            store.finish_session(failed, 'failed')
+        with create_results_store('sqlite', path=path) as store:
+            assert store.get_patient_results(456)[0]['session_id'] == first
+            assert store.create_session(456) == failed + 1
+
+    def test_unknown_backend(self):
+        """Test unknown backends raise error."""
+        with pytest.raises(ValueError, match="Unknown results store backend"):
+            create_results_store('cassandra')
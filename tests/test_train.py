@@ -0,0 +1,70 @@
+"""Tests for the training entry points' experiment caching."""
+
+import numpy as np
+import pytest
+import scipy.io
+
+pytest.importorskip("tensorflow")
+pytest.importorskip("matplotlib")
+
+import src.models.train as train_module
+from src.data.loader import APNEADataLoader
+from src.models.train import train_rf
+from src.utils.cache import ExperimentCache
+
+
+class TestTrainRFCache:
+    """Test cache hits and misses of train_rf."""
+
+    def test_hit_and_miss(self, feature_csv, tmp_path, monkeypatch):
+        """Test an unchanged run restores the model and a changed one retrains."""
+        cache_dir = str(tmp_path / "cache")
+        model_path = tmp_path / "models" / "rf.pkl"
+        reports = train_rf(feature_csv, str(model_path), cache_dir=cache_dir,
+                           rf_params={'n_estimators': 10}, n_splits=3)
+        assert len(reports) == 3
+
+        class NoTraining:
+            def __init__(self, **kwargs):
+                raise AssertionError("cache hit must not retrain")
+
+        monkeypatch.setattr(train_module, 'SleepApneaRFModel', NoTraining)
+        model_path.unlink()
+        assert train_rf(feature_csv, str(model_path), cache_dir=cache_dir,
+                        rf_params={'n_estimators': 10}, n_splits=3) == reports
+        assert model_path.exists()
+
+        # The artifact is stored under a fixed name, so another extension also hits
+        joblib_path = tmp_path / "models" / "rf.joblib"
+        assert train_rf(feature_csv, str(joblib_path), cache_dir=cache_dir,
+                        rf_params={'n_estimators': 10}, n_splits=3) == reports
+        assert joblib_path.read_bytes() == model_path.read_bytes()
+
+        with pytest.raises(AssertionError, match="must not retrain"):
+            train_rf(feature_csv, str(model_path), cache_dir=cache_dir,
+                     rf_params={'n_estimators': 20}, n_splits=3)
+
+    def test_missing_artifact_is_miss(self, feature_csv, tmp_path):
+        """Test a cache entry without its model file retrains instead of crashing."""
+        cache_dir = str(tmp_path / "cache")
+        model_path = tmp_path / "rf.pkl"
+        train_rf(feature_csv, str(model_path), cache_dir=cache_dir, rf_params={'n_estimators': 10},
+                 n_splits=3)
+        for artifact in (tmp_path / "cache" / "runs").glob("*/model.pkl"):
+            artifact.unlink()
+        model_path.unlink()
+        train_rf(feature_csv, str(model_path), cache_dir=cache_dir, rf_params={'n_estimators': 10},
+                 n_splits=3)
+        assert model_path.exists()
+
+
+def test_segments_manifest_in_cache_dir(tmp_path, monkeypatch):
+    """Test the segments key keeps its manifest under the cache root, not the cwd."""
+    (tmp_path / "data" / "RR").mkdir(parents=True)
+    scipy.io.savemat(tmp_path / "data" / "RR" / "C1.mat", {'RR': np.ones((120, 1))})
+    monkeypatch.chdir(tmp_path)
+    cache = ExperimentCache(str(tmp_path / "experiments"))
+    key = train_module.segments_cache_key(APNEADataLoader(str(tmp_path / "data")), cache)
+    assert key == train_module.segments_cache_key(APNEADataLoader(str(tmp_path / "data")), cache)
+    assert len(list((tmp_path / "experiments" / "manifests").glob("*.json"))) == 1
+    assert not (tmp_path / "cache").exists()
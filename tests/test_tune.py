@@ -0,0 +1,59 @@
+"""Tests for successive-halving Random Forest tuning."""
+
+import json
+
+import numpy as np
+import pytest
+from src.models.tune import expand_grid, load_folds, successive_halving, tune_rf
+
+
+def test_expand_grid():
+    """Test grids expand into every combination."""
+    configs = expand_grid({'max_depth': [None, 5], 'min_samples_leaf': [1, 2, 4]})
+    assert len(configs) == 6
+    assert {'max_depth': 5, 'min_samples_leaf': 4} in configs
+
+
+def test_load_folds_cached(feature_csv, tmp_path):
+    """Test fold assignment is stratified and reused from the cache."""
+    X, y, fold = load_folds(feature_csv, n_splits=3, cache_dir=str(tmp_path / "cache"))
+    assert X.shape == (60, 2)
+    assert sorted(np.bincount(fold)) == [20, 20, 20]
+    assert all(np.sum(y[fold == k] == 'C') == 10 for k in range(3))
+
+    X2, y2, fold2 = load_folds(feature_csv, n_splits=3, cache_dir=str(tmp_path / "cache"))
+    assert np.array_equal(X, X2) and np.array_equal(y, y2) and np.array_equal(fold, fold2)
+
+
+def test_successive_halving_budget(feature_csv):
+    """Test candidates are halved while surviving forests grow."""
+    X, y, fold = load_folds(feature_csv, n_splits=3)
+    configs = expand_grid({'max_depth': [1, 3, None], 'min_samples_leaf': [1, 5, 10]})
+    result = successive_halving(X, y, fold, configs, min_estimators=4, max_estimators=36,
+                                eta=3, n_jobs=1)
+
+    assert [r['n_candidates'] for r in result['rungs']] == [9, 3, 1]
+    assert [r['n_estimators'] for r in result['rungs']] == [4, 12, 36]
+    assert result['best_params']['n_estimators'] == 36
+    # Warm starts only add trees: 9*4 + 3*(12-4) + 1*(36-12) per fold
+    assert result['trees_fitted'] == 3 * (36 + 24 + 24)
+    assert result['trees_fitted'] < result['full_grid_trees']
+
+
+def test_successive_halving_invalid_eta(feature_csv):
+    """Test eta below 2 is rejected."""
+    X, y, fold = load_folds(feature_csv, n_splits=3)
+    with pytest.raises(ValueError, match="eta"):
+        successive_halving(X, y, fold, expand_grid({'max_depth': [1]}), eta=1)
+
+
+def test_tune_rf_writes_results(feature_csv, tmp_path):
+    """Test best configuration and timing breakdown are written."""
+    output = tmp_path / "out" / "rf_tuning.json"
+    tune_rf(feature_csv, str(output), grid={'max_depth': [2, None]}, n_splits=3,
+            min_estimators=4, max_estimators=8, eta=2, n_jobs=1)
+    with open(output) as f:
+        result = json.load(f)
+    assert set(result['best_params']) == {'max_depth', 'n_estimators'}
+    assert set(result['timing']) == {'load_folds_sec', 'search_sec', 'total_sec'}
+    assert len(result['rungs']) == 2